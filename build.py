@@ -113,13 +113,17 @@ def initialize(project):
             "tblib~=1.5",
             "tailer~=0.4",
             "setuptools>=45.0.0",
-            "virtualenv>=20.0.0",
+            # vendor_patches/virtualenv.patch is made against this exact release
+            "virtualenv==20.16.6",
             "importlib-resources>=1.0",
             "importlib-metadata>=0.12,<5.0",
             "typing-extensions",
             "colorama~=0.4.3",
         ],
     )
+    project.set_property(
+        "vendorize_patches", ["src/main/vendor_patches/virtualenv.patch"]
+    )
     project.set_property(
         "vendorize_cleanup_globs", ["bin", "setuptools", "easy_install.py", "*.pth"]
     )
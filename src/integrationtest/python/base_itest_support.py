@@ -31,10 +31,41 @@ except ImportError:
     _addError = None
 
 
+# test directories hold whole virtual environments
+_TMPFS_MIN_FREE_BYTES = 1024 * 1024 * 1024
+
+
+def _find_tmpfs_dir():
+    """Returns a writable memory-backed directory to host test directories in, if any.
+    Opt in with PYB_ITEST_TMPFS=1; mounts that forbid executing files or are short on space are skipped.
+    """
+    if os.environ.get("PYB_ITEST_TMPFS") != "1":
+        return None
+
+    for candidate in ("/dev/shm", os.environ.get("XDG_RUNTIME_DIR")):
+        if (
+            candidate
+            and os.path.isdir(candidate)
+            and os.access(candidate, os.W_OK | os.X_OK)
+        ):
+            fs_stat = os.statvfs(candidate)
+            if fs_stat.f_flag & getattr(os, "ST_NOEXEC", 0):
+                continue
+            if fs_stat.f_bavail * fs_stat.f_frsize < _TMPFS_MIN_FREE_BYTES:
+                continue
+            return candidate
+    return None
+
+
+TMPFS_DIR = _find_tmpfs_dir()
+
+
 class BaseIntegrationTestSupport(unittest.TestCase):
     def setUp(self):
         self.tmp_directory = tempfile.mkdtemp(
-            prefix="IntegrationTestSupport", suffix=str(uuid4()).replace("-", "")
+            prefix="IntegrationTestSupport",
+            suffix=str(uuid4()).replace("-", ""),
+            dir=TMPFS_DIR,
         )
 
     def tearDown(self):
@@ -66,6 +97,15 @@ class BaseIntegrationTestSupport(unittest.TestCase):
         with open(self.full_path(name), "wb") as file:
             file.writelines(content)
 
+    def write_binary_files(self, files):
+        """Writes a mapping of file names to binary content, creating parent directories once"""
+        paths = {self.full_path(name): content for name, content in files.items()}
+        for directory in {os.path.dirname(path) for path in paths}:
+            os.makedirs(directory, exist_ok=True)
+        for path, content in paths.items():
+            with open(path, "wb") as file:
+                file.write(content)
+
     def write_build_file(self, content):
         self.write_file("build.py", content)
 
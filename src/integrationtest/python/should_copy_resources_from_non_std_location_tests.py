@@ -38,10 +38,13 @@ def init (project):
         )
 
         self.create_directory("src/main/python")
-        self.create_directory("src/main/resources/foo")
-        self.write_file("src/main/resources/spam", "spam")
-        self.write_file("src/main/resources/eggs", "eggs")
-        self.write_file("src/main/resources/foo/bar", "bar")
+        self.write_binary_files(
+            {
+                "src/main/resources/spam": b"spam",
+                "src/main/resources/eggs": b"eggs",
+                "src/main/resources/foo/bar": b"bar",
+            }
+        )
 
         reactor = self.prepare_reactor()
         reactor.build("package")
@@ -16,15 +16,120 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import errno
+import os
+import stat
+import subprocess
 import sys
-from os import chdir, getcwd
-from os.path import dirname, exists, isdir, isfile
+from os.path import isdir
 from os.path import join as jp
-from runpy import run_module, run_path
-from shutil import copy2, copytree
+from pathlib import Path
+from shutil import which
 
 import base_itest_support
 
+_COPY_CHUNK = 1 << 30
+_NO_FAST_COPY = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.EPERM,
+    errno.ENOTSOCK,
+}
+
+
+def _copy_fd(in_fd, out_fd):
+    if hasattr(os, "copy_file_range"):
+        try:
+            while os.copy_file_range(in_fd, out_fd, _COPY_CHUNK):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in _NO_FAST_COPY:
+                raise
+
+    if sys.platform.startswith("linux"):
+        try:
+            while os.sendfile(out_fd, in_fd, None, _COPY_CHUNK):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in _NO_FAST_COPY:
+                raise
+
+    while True:
+        buf = os.read(in_fd, 1 << 20)
+        if not buf:
+            break
+        view = memoryview(buf)
+        while view:
+            view = view[os.write(out_fd, view) :]
+
+
+def _copy_file(src, dst):
+    """Copies file content in-kernel where possible.
+    The file is created with the permission bits of the source (scripts must stay executable),
+    but no other metadata is copied.
+    """
+    in_fd = os.open(src, os.O_RDONLY)
+    try:
+        mode = stat.S_IMODE(os.fstat(in_fd).st_mode)
+        out_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        try:
+            _copy_fd(in_fd, out_fd)
+        finally:
+            os.close(out_fd)
+    finally:
+        os.close(in_fd)
+
+
+def _fast_copytree(src, dst):
+    os.mkdir(dst)
+    with os.scandir(src) as entries:
+        for entry in entries:
+            dst_path = jp(dst, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                _fast_copytree(entry.path, dst_path)
+            elif entry.is_symlink():
+                os.symlink(os.readlink(entry.path), dst_path)
+            else:
+                _copy_file(entry.path, dst_path)
+
+
+def _robocopy(src, dst, *args):
+    # Robocopy exit codes below 8 all indicate success
+    rc = subprocess.call(
+        ["robocopy", src, dst, "/MT:64", "/NDL", "/NFL", "/NJH", "/NJS", "/SL"]
+        + list(args),
+        stdout=subprocess.DEVNULL,
+    )
+    if rc >= 8:
+        raise RuntimeError(
+            "robocopy of %r to %r failed with exit code %d" % (src, dst, rc)
+        )
+
+
+def _copy_project_files(src_dir, dst_dir, names):
+    if sys.platform == "win32" and which("robocopy"):
+        files = []
+        for name in names:
+            src = jp(src_dir, name)
+            if isdir(src):
+                _robocopy(src, jp(dst_dir, name), "/E")
+            else:
+                files.append(name)
+        if files:
+            _robocopy(src_dir, dst_dir, *files)
+        return
+
+    for name in names:
+        src = jp(src_dir, name)
+        if isdir(src):
+            _fast_copytree(src, jp(dst_dir, name))
+        else:
+            _copy_file(src, jp(dst_dir, name))
+
 
 class SmokeIntegrationTestSupport(base_itest_support.BaseIntegrationTestSupport):
     """This class runs the actual project at arm's length as opposed to deeply integrating with it.
@@ -33,81 +138,38 @@ class SmokeIntegrationTestSupport(base_itest_support.BaseIntegrationTestSupport)
 
     PROJECT_FILES = ["build.py", "src", "README.md", "LICENSE"]
 
+    _cached_src_dir = None
+
+    @classmethod
+    def _find_src_dir(cls):
+        if cls._cached_src_dir is None:
+            support_file = Path(base_itest_support.__file__).absolute()
+            for candidate_dir in support_file.parents:
+                if (candidate_dir / "build.py").is_file():
+                    SmokeIntegrationTestSupport._cached_src_dir = str(candidate_dir)
+                    break
+            else:
+                raise RuntimeError(
+                    "Unable to find location of the project's build.py"
+                )
+        return cls._cached_src_dir
+
     def setUp(self):
         super().setUp()
-        cur_dir = dirname(base_itest_support.__file__)
-        prev_dir = None
-
-        self.src_dir = None
-        while cur_dir != prev_dir:
-            candidate_build_py = jp(cur_dir, "build.py")
-            if exists(candidate_build_py) and isfile(candidate_build_py):
-                self.src_dir = cur_dir
-                break
-            prev_dir = cur_dir
-            cur_dir = dirname(prev_dir)
-
-        if not self.src_dir:
-            raise RuntimeError("Unable to find location of the project's build.py")
-
-        for src in self.PROJECT_FILES:
-            src_file = jp(self.src_dir, src)
-            if isdir(src_file):
-                copytree(src_file, jp(self.tmp_directory, src))
-            else:
-                copy2(src_file, self.tmp_directory)
+        self.src_dir = self._find_src_dir()
+        _copy_project_files(self.src_dir, self.tmp_directory, self.PROJECT_FILES)
 
         self.build_py = jp(self.tmp_directory, "build.py")
 
     def smoke_test(self, *args):
-        old_argv = list(sys.argv)
-        del sys.argv[:]
-        sys.argv.append(self.build_py)
-        sys.argv.extend(args)
-
-        old_modules = dict(sys.modules)
-        old_meta_path = list(sys.meta_path)
-        old_cwd = getcwd()
-        chdir(self.tmp_directory)
-        try:
-            return run_path(self.build_py, run_name="__main__")
-        except SystemExit as e:
-            self.assertEqual(e.code, 0, "Test did not exit successfully")
-        finally:
-            del sys.argv[:]
-            sys.argv.extend(old_argv)
-
-            sys.modules.clear()
-            sys.modules.update(old_modules)
-
-            del sys.meta_path[:]
-            sys.meta_path.extend(old_meta_path)
-            chdir(old_cwd)
+        self._smoke_run([self.build_py] + list(args))
 
     def smoke_test_module(self, module, *args):
-        old_argv = list(sys.argv)
-        del sys.argv[:]
-        sys.argv.append("bogus")
-        sys.argv.extend(args)
-
-        old_modules = dict(sys.modules)
-        old_meta_path = list(sys.meta_path)
-        old_cwd = getcwd()
-        chdir(self.tmp_directory)
-        try:
-            return run_module(module, run_name="__main__")
-        except SystemExit as e:
-            self.assertEqual(e.code, 0, "Test did not exit successfully")
-        finally:
-            del sys.argv[:]
-            sys.argv.extend(old_argv)
-
-            sys.modules.clear()
-            sys.modules.update(old_modules)
+        self._smoke_run(["-m", module] + list(args))
 
-            del sys.meta_path[:]
-            sys.meta_path.extend(old_meta_path)
-            chdir(old_cwd)
+    def _smoke_run(self, args):
+        rc = subprocess.call([sys.executable] + args, cwd=self.tmp_directory)
+        self.assertEqual(rc, 0, "Test did not exit successfully")
 
     def tearDown(self):
         try:
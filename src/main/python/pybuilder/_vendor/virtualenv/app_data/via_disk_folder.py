@@ -24,8 +24,10 @@ virtualenv-app-data
 
 import json
 import logging
+import os
 from abc import ABCMeta
 from contextlib import contextmanager
+from functools import lru_cache
 from hashlib import sha256
 
 from ..util.lock import ReentrantFileLock
@@ -34,6 +36,11 @@ from ..util.zipapp import extract
 from ..version import __version__
 from .base import AppData, ContentStore
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 class AppDataDiskFolder(AppData):
     """
@@ -88,11 +95,14 @@ class AppDataDiskFolder(AppData):
         """ """
         py_info_folder = self.py_info_at
         with py_info_folder:
-            for filename in py_info_folder.path.iterdir():
-                if filename.suffix == ".json":
-                    with py_info_folder.lock_for_key(filename.stem):
-                        if filename.exists():
-                            filename.unlink()
+            with os.scandir(py_info_folder.path) as entries:
+                json_files = [e for e in entries if e.name.endswith(".json")]
+            for entry in json_files:
+                with py_info_folder.lock_for_key(entry.name[: -len(".json")]):
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
 
     def embed_update_log(self, distribution, for_py_version):
         return EmbedDistributionUpdateStoreDisk(
@@ -110,6 +120,10 @@ class AppDataDiskFolder(AppData):
 
 
 class JSONStoreDisk(ContentStore, metaclass=ABCMeta):
+    # content parsed in this process, keyed by file and validated by (st_mtime_ns, st_size)
+    # callers share the returned objects and must not mutate them
+    _MEM_CACHE = {}
+
     def __init__(self, in_folder, key, msg, msg_args):
         self.in_folder = in_folder
         self.key = key
@@ -126,7 +140,14 @@ class JSONStoreDisk(ContentStore, metaclass=ABCMeta):
     def read(self):
         data, bad_format = None, False
         try:
-            data = json.loads(self.file.read_text())
+            file = self.file
+            st = os.stat(file)
+            cached = self._MEM_CACHE.get(file)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                data = cached[2]
+            else:
+                data = json.loads(file.read_text())
+                self._MEM_CACHE[file] = (st.st_mtime_ns, st.st_size, data)
             logging.debug(f"got {self.msg} from %s", *self.msg_args)
             return data
         except ValueError:
@@ -141,6 +162,7 @@ class JSONStoreDisk(ContentStore, metaclass=ABCMeta):
         return None
 
     def remove(self):
+        self._MEM_CACHE.pop(self.file, None)
         self.file.unlink()
         logging.debug(f"removed {self.msg} at %s", *self.msg_args)
 
@@ -152,13 +174,24 @@ class JSONStoreDisk(ContentStore, metaclass=ABCMeta):
     def write(self, content):
         folder = self.file.parent
         folder.mkdir(parents=True, exist_ok=True)
-        self.file.write_text(json.dumps(content, sort_keys=True, indent=2))
+        self._MEM_CACHE.pop(self.file, None)
+        if orjson is not None:
+            self.file.write_bytes(orjson.dumps(content, option=orjson.OPT_SORT_KEYS))
+        else:
+            self.file.write_text(
+                json.dumps(content, sort_keys=True, separators=(",", ":"))
+            )
         logging.debug(f"wrote {self.msg} at %s", *self.msg_args)
 
 
+@lru_cache(maxsize=256)
+def _py_info_key(path_str):
+    return sha256(path_str.encode("utf-8")).hexdigest()
+
+
 class PyInfoStoreDisk(JSONStoreDisk):
     def __init__(self, in_folder, path):
-        key = sha256(str(path).encode("utf-8")).hexdigest()
+        key = _py_info_key(str(path))
         super().__init__(in_folder, key, "python info of %s", (path,))
 
 
@@ -1,6 +1,7 @@
 import logging
 from tempfile import mkdtemp
 
+from ..util.lock import ProcessLocalLock
 from ..util.path import safe_delete
 from .via_disk_folder import AppDataDiskFolder
 
@@ -11,6 +12,8 @@ class TempAppData(AppDataDiskFolder):
 
     def __init__(self):
         super().__init__(folder=mkdtemp())
+        # no other process can reach the folder, so file system locks are unnecessary
+        self.lock = ProcessLocalLock(self.lock.path)
         logging.debug("created temporary app data folder %s", self.lock.path)
 
     def reset(self):
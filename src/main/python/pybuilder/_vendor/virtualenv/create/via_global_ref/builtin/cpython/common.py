@@ -1,6 +1,7 @@
 from abc import ABCMeta
-from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
+from weakref import WeakKeyDictionary
 
 from ....describe import PosixSupports, WindowsSupports
 from ..ref import RefMust, RefWhen
@@ -24,19 +25,12 @@ class CPythonPosix(CPython, PosixSupports, metaclass=ABCMeta):
 
     @classmethod
     def _executables(cls, interpreter):
-        host_exe = Path(interpreter.system_executable)
-        major, minor = interpreter.version_info.major, interpreter.version_info.minor
-        targets = OrderedDict(
-            (i, None)
-            for i in [
-                "python",
-                f"python{major}",
-                f"python{major}.{minor}",
-                host_exe.name,
-            ]
+        ver = interpreter.version_info
+        host_exe, targets = _posix_exe_targets(
+            interpreter.system_executable, ver.major, ver.minor
         )
-        must = RefMust.COPY if interpreter.version_info.major == 2 else RefMust.NA
-        yield host_exe, list(targets.keys()), must, RefWhen.ANY
+        must = RefMust.COPY if ver.major == 2 else RefMust.NA
+        yield host_exe, list(targets), must, RefWhen.ANY
 
 
 class CPythonWindows(CPython, WindowsSupports, metaclass=ABCMeta):
@@ -46,8 +40,8 @@ class CPythonWindows(CPython, WindowsSupports, metaclass=ABCMeta):
         # - https://bugs.python.org/issue42013
         # - venv
         host = cls.host_python(interpreter)
-        for path in (host.parent / n for n in {"python.exe", host.name}):
-            yield host, [path.name], RefMust.COPY, RefWhen.ANY
+        for name in _windows_exe_targets(host.name):
+            yield host, [name], RefMust.COPY, RefWhen.ANY
         # for more info on pythonw.exe see https://stackoverflow.com/a/30313091
         python_w = host.parent / "pythonw.exe"
         yield python_w, [python_w.name], RefMust.COPY, RefWhen.ANY
@@ -57,12 +51,30 @@ class CPythonWindows(CPython, WindowsSupports, metaclass=ABCMeta):
         return Path(interpreter.system_executable)
 
 
+@lru_cache(maxsize=64)
+def _posix_exe_targets(system_executable, major, minor):
+    host_exe = Path(system_executable)
+    names = ("python", f"python{major}", f"python{major}.{minor}", host_exe.name)
+    return host_exe, tuple(dict.fromkeys(names))
+
+
+@lru_cache(maxsize=64)
+def _windows_exe_targets(host_name):
+    return tuple(dict.fromkeys(("python.exe", host_name)))
+
+
+_mac_os_frameworks = WeakKeyDictionary()
+
+
 def is_mac_os_framework(interpreter):
-    if interpreter.platform == "darwin":
+    if interpreter.platform != "darwin":
+        return False
+    result = _mac_os_frameworks.get(interpreter)
+    if result is None:
         framework_var = interpreter.sysconfig_vars.get("PYTHONFRAMEWORK")
         value = "Python3" if interpreter.version_info.major == 3 else "Python"
-        return framework_var == value
-    return False
+        result = _mac_os_frameworks[interpreter] = framework_var == value
+    return result
 
 
 __all__ = [
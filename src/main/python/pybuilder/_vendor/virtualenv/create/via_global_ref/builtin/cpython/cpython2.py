@@ -1,5 +1,6 @@
 import abc
 import logging
+from functools import lru_cache
 from pathlib import Path
 
 from ..python2.python2 import Python2
@@ -26,7 +27,7 @@ class CPython2(CPython, Python2, metaclass=abc.ABCMeta):
 
     @classmethod
     def host_include_marker(cls, interpreter):
-        return Path(interpreter.system_include) / "Python.h"
+        return _include_marker(interpreter.system_include)
 
     @property
     def include(self):
@@ -79,11 +80,13 @@ class CPython2Posix(CPython2PosixBase):
     def sources(cls, interpreter):
         yield from super().sources(interpreter)
         # landmark for exec_prefix
-        exec_marker_file, to_path, _ = cls.from_stdlib(
-            cls.mappings(interpreter), "lib-dynload"
-        )
+        exec_marker_file, to_path, _ = cls.exec_marker(interpreter)
         yield PathRefToDest(exec_marker_file, dest=to_path)
 
+    @classmethod
+    def exec_marker(cls, interpreter):
+        return _exec_marker(cls, interpreter)
+
 
 class CPython2Windows(CPython2, CPythonWindows):
     """CPython 2 on Windows"""
@@ -91,17 +94,34 @@ class CPython2Windows(CPython2, CPythonWindows):
     @classmethod
     def sources(cls, interpreter):
         yield from super().sources(interpreter)
-        py27_dll = Path(interpreter.system_executable).parent / "python27.dll"
+        py27_dll, libs = _win_extra_paths(
+            interpreter.system_executable, interpreter.system_prefix
+        )
         if (
             py27_dll.exists()
         ):  # this might be global in the Windows folder in which case it's alright to be missing
             yield PathRefToDest(py27_dll, dest=cls.to_bin)
 
-        libs = Path(interpreter.system_prefix) / "libs"
         if libs.exists():
             yield PathRefToDest(libs, dest=lambda self, s: self.dest / s.name)
 
 
+@lru_cache(maxsize=8)
+def _exec_marker(creator_class, interpreter):
+    # interpreter infos are reused per executable, so they key the cache as well as the paths they carry would
+    return creator_class.from_stdlib(creator_class.mappings(interpreter), "lib-dynload")
+
+
+@lru_cache(maxsize=8)
+def _include_marker(system_include):
+    return Path(system_include) / "Python.h"
+
+
+@lru_cache(maxsize=8)
+def _win_extra_paths(system_executable, system_prefix):
+    return Path(system_executable).parent / "python27.dll", Path(system_prefix) / "libs"
+
+
 __all__ = [
     "CPython2",
     "CPython2PosixBase",
@@ -1,18 +1,51 @@
 """The Apple Framework builds require their own customization"""
 import logging
+import mmap
 import os
+import shutil
 import struct
 import subprocess
 from abc import ABCMeta, abstractmethod
+from functools import lru_cache
 from pathlib import Path
 from textwrap import dedent
 
+try:
+    from functools import cached_property
+except ImportError:  # pragma: no cover # Python 3.7
+    cached_property = property
+
 from .....info import IS_MAC_ARM64
 from ..ref import ExePathRefToDest, PathRefToDest, RefMust
 from .common import CPython, CPythonPosix, is_mac_os_framework
 from .cpython2 import CPython2PosixBase
 from .cpython3 import CPython3
 
+# virtualenv logs through the root logger; holding on to it lets debug arguments be skipped when nobody listens
+_LOG = logging.getLogger()
+
+# precompiled unsigned 32-bit field layouts used to parse Mach-O headers and load commands
+_U32_BE = struct.Struct(">L")
+_U32_LE = struct.Struct("<L")
+_U32_BE_2 = struct.Struct(">2L")
+_U32_LE_2 = struct.Struct("<2L")
+_U32_BE_5 = struct.Struct(">5L")
+_U32_LE_5 = struct.Struct("<5L")
+_U32_BE_6 = struct.Struct(">6L")
+_U32_LE_6 = struct.Struct("<6L")
+# MH_MAGIC, MH_CIGAM, MH_MAGIC_64, MH_CIGAM_64 and FAT_MAGIC as read big-endian
+_MACHO_MAGICS = frozenset({0xFEEDFACE, 0xCEFAEDFE, 0xFEEDFACF, 0xCFFAEDFE, 0xCAFEBABE})
+_U32_STRUCTS = {
+    (">", 1): _U32_BE,
+    ("<", 1): _U32_LE,
+    (">", 2): _U32_BE_2,
+    ("<", 2): _U32_LE_2,
+    (">", 5): _U32_BE_5,
+    ("<", 5): _U32_LE_5,
+    (">", 6): _U32_BE_6,
+    ("<", 6): _U32_LE_6,
+}
+
 
 class CPythonmacOsFramework(CPython, metaclass=ABCMeta):
     @classmethod
@@ -93,7 +126,7 @@ class CPython2macOsFramework(CPythonmacOsFramework, CPython2PosixBase):
             resources, dest=lambda self, _: self.dest / "Resources"
         )  # noqa: U101
 
-    @property
+    @cached_property
     def reload_code(self):
         result = super().reload_code
         result = dedent(
@@ -132,21 +165,23 @@ class CPython2macOsArmFramework(
         As a temporary workaround we can codesign the python exe during the creation process.
         """
         exe = self.exe
+        debug = _LOG.isEnabledFor(logging.DEBUG)
         try:
-            logging.debug("Changing signature of copied python exe %s", exe)
-            bak_dir = exe.parent / "bk"
+            if debug:
+                _LOG.debug("Changing signature of copied python exe %s", exe)
             # Reset the signing on Darwin since the exe has been modified.
-            # Note codesign fails on the original exe, it needs to be copied and moved back.
-            bak_dir.mkdir(parents=True, exist_ok=True)
-            subprocess.check_call(["cp", str(exe), str(bak_dir)])
-            subprocess.check_call(["mv", str(bak_dir / exe.name), str(exe)])
-            bak_dir.rmdir()
+            # Note codesign fails on the original exe, it needs to be copied and moved back (to get a new inode).
+            bak = exe.with_name(exe.name + ".bk")
+            shutil.copy2(str(exe), str(bak))
+            os.replace(str(bak), str(exe))
             metadata = "--preserve-metadata=identifier,entitlements,flags,runtime"
-            cmd = ["codesign", "-s", "-", metadata, "-f", str(exe)]
-            logging.debug("Changing Signature: %s", cmd)
-            subprocess.check_call(cmd)
+            cmd = [_codesign_exe(), "-s", "-", metadata, "-f", str(exe)]
+            if debug:
+                _LOG.debug("Changing Signature: %s", cmd)
+            # an absolute executable without close_fds lets CPython spawn via posix_spawn instead of fork + exec
+            subprocess.check_call(cmd, close_fds=False)
         except Exception:
-            logging.fatal(
+            _LOG.fatal(
                 "Could not change MacOS code signing on copied python exe at %s", exe
             )
             raise
@@ -169,7 +204,7 @@ class CPython3macOsFramework(CPythonmacOsFramework, CPython3, CPythonPosix):
             exe, dest=lambda self, _: self.dest / ".Python", must=RefMust.SYMLINK
         )  # noqa: U101
 
-    @property
+    @cached_property
     def reload_code(self):
         result = super().reload_code
         result = dedent(
@@ -187,6 +222,12 @@ class CPython3macOsFramework(CPythonmacOsFramework, CPython3, CPythonPosix):
         return result
 
 
+@lru_cache(maxsize=None)
+def _codesign_exe():
+    """resolve codesign once per process, falling back to a PATH lookup at call time"""
+    return shutil.which("codesign") or "codesign"
+
+
 def fix_mach_o(exe, current, new, max_size):
     """
     https://en.wikipedia.org/wiki/Mach-O
@@ -211,11 +252,18 @@ def fix_mach_o(exe, current, new, max_size):
     (found in the __LINKEDIT section) function. In 10.6 these new Link Edit tables are compressed by removing unused and
     unneeded bits of information, however Mac OS X 10.5 and earlier cannot read this new Link Edit table format.
     """
+    with open(exe, "rb") as f:
+        head = f.read(4)
+    if len(head) < 4 or _U32_BE.unpack(head)[0] not in _MACHO_MAGICS:
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug("skip changing %s as it is not a Mach-O file", exe)
+        return
     try:
-        logging.debug("change Mach-O for %s from %s to %s", exe, current, new)
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug("change Mach-O for %s from %s to %s", exe, current, new)
         _builtin_change_mach_o(max_size)(exe, current, new)
     except Exception as e:
-        logging.warning(
+        _LOG.warning(
             "Could not call _builtin_change_mac_o: %s. "
             "Trying to call install_name_tool instead.",
             e,
@@ -224,7 +272,7 @@ def fix_mach_o(exe, current, new, max_size):
             cmd = ["install_name_tool", "-change", current, new, exe]
             subprocess.check_call(cmd)
         except Exception:
-            logging.fatal(
+            _LOG.fatal(
                 "Could not call install_name_tool -- you must "
                 "have Apple's development tools installed"
             )
@@ -241,73 +289,21 @@ def _builtin_change_mach_o(maxint):
     LITTLE_ENDIAN = "<"  # noqa: N806
     LC_LOAD_DYLIB = 0xC  # noqa: N806
 
-    class FileView:
-        """A proxy for file-like objects that exposes a given view of a file. Modified from macholib."""
-
-        def __init__(self, file_obj, start=0, size=maxint):
-            if isinstance(file_obj, FileView):
-                self._file_obj = file_obj._file_obj
-            else:
-                self._file_obj = file_obj
-            self._start = start
-            self._end = start + size
-            self._pos = 0
-
-        def __repr__(self):
-            return f"<fileview [{self._start:d}, {self._end:d}] {self._file_obj!r}>"
-
-        def tell(self):
-            return self._pos
-
-        def _checkwindow(self, seek_to, op):
-            if not self._start <= seek_to <= self._end:
-                msg = f"{op} to offset {seek_to:d} is outside window [{self._start:d}, {self._end:d}]"
-                raise OSError(msg)
-
-        def seek(self, offset, whence=0):
-            seek_to = offset
-            if whence == os.SEEK_SET:
-                seek_to += self._start
-            elif whence == os.SEEK_CUR:
-                seek_to += self._start + self._pos
-            elif whence == os.SEEK_END:
-                seek_to += self._end
-            else:
-                raise OSError(f"Invalid whence argument to seek: {whence!r}")
-            self._checkwindow(seek_to, "seek")
-            self._file_obj.seek(seek_to)
-            self._pos = seek_to - self._start
-
-        def write(self, content):
-            here = self._start + self._pos
-            self._checkwindow(here, "write")
-            self._checkwindow(here + len(content), "write")
-            self._file_obj.seek(here, os.SEEK_SET)
-            self._file_obj.write(content)
-            self._pos += len(content)
-
-        def read(self, size=maxint):
-            assert size >= 0
-            here = self._start + self._pos
-            self._checkwindow(here, "read")
-            size = min(size, self._end - here)
-            self._file_obj.seek(here, os.SEEK_SET)
-            read_bytes = self._file_obj.read(size)
-            self._pos += len(read_bytes)
-            return read_bytes
-
-    def read_data(file, endian, num=1):
-        """Read a given number of 32-bits unsigned integers from the given file with the given endianness."""
-        res = struct.unpack(endian + "L" * num, file.read(num * 4))
-        if len(res) == 1:
-            return res[0]
-        return res
-
     def mach_o_change(at_path, what, value):
         """Replace a given name (what) in any LC_LOAD_DYLIB command found in the given binary with a new name (value),
         provided it's shorter."""
 
-        def do_macho(file, bits, endian):
+        def check_window(start, end, window_start, window_end, what):
+            if not window_start <= start <= end <= window_end:
+                msg = f"{what} [{start:d}, {end:d}] is outside window [{window_start:d}, {window_end:d}]"
+                # a malformed file, unlike a failed mapping, fails the same way when retried
+                raise ValueError(msg)
+
+        def do_macho(mm, offset, window_end, bits, endian):
+            """yield the absolute offset of the load command name that needs replacing, if any"""
+            # pick the unpackers for this image's endianness once, rather than per field read
+            unpack_u32 = _U32_STRUCTS[endian, 1].unpack_from
+            unpack_command = _U32_STRUCTS[endian, 2].unpack_from
             # Read Mach-O header (the magic number is assumed read by the caller)
             (
                 cpu_type,
@@ -316,56 +312,67 @@ def _builtin_change_mach_o(maxint):
                 n_commands,
                 size_of_commands,
                 flags,
-            ) = read_data(file, endian, 6)
+            ) = _U32_STRUCTS[endian, 6].unpack_from(mm, offset + 4)
             # 64-bits header has one more field.
-            if bits == 64:
-                read_data(file, endian)
+            where = offset + (32 if bits == 64 else 28)
+            check_window(offset, where + size_of_commands, offset, window_end, "load commands")
             # The header is followed by n commands
             for _ in range(n_commands):
-                where = file.tell()
                 # Read command header
-                cmd, cmd_size = read_data(file, endian, 2)
+                cmd, cmd_size = unpack_command(mm, where)
+                # a command never spans less than its own header, which also guarantees the scan moves forward
+                check_window(where, where + max(cmd_size, 8), offset, window_end, "load command")
                 if cmd == LC_LOAD_DYLIB:
                     # The first data field in LC_LOAD_DYLIB commands is the offset of the name, starting from the
                     # beginning of the  command.
-                    name_offset = read_data(file, endian)
-                    file.seek(where + name_offset, os.SEEK_SET)
+                    (name_offset,) = unpack_u32(mm, where + 8)
+                    start = where + name_offset
                     # Read the NUL terminated string
-                    load = file.read(cmd_size - name_offset).decode()
-                    load = load[: load.index("\0")]
-                    # If the string is what is being replaced, overwrite it.
-                    if load == what:
-                        file.seek(where + name_offset, os.SEEK_SET)
-                        file.write(value.encode() + b"\0")
-                # Seek to the next command
-                file.seek(where + cmd_size, os.SEEK_SET)
-
-        def do_file(file, offset=0, size=maxint):
-            file = FileView(file, offset, size)
+                    name_end = mm.find(b"\0", start, where + cmd_size)
+                    if name_end < 0:
+                        raise ValueError(f"unterminated load command name at offset {start:d}")
+                    # If the string is what is being replaced, remember where to overwrite it.
+                    if name_end - start == len(what_bytes) and mm[start:name_end] == what_bytes:
+                        yield start
+                        # an image links a given dylib at most once, the remaining commands need no scanning
+                        return
+                # Move to the next command
+                where += cmd_size
+
+        def do_file(mm, offset, window_end):
             # Read magic number
-            magic = read_data(file, BIG_ENDIAN)
+            (magic,) = _U32_BE.unpack_from(mm, offset)
             if magic == FAT_MAGIC:
                 # Fat binaries contain nfat_arch Mach-O binaries
-                n_fat_arch = read_data(file, BIG_ENDIAN)
-                for _ in range(n_fat_arch):
+                (n_fat_arch,) = _U32_BE.unpack_from(mm, offset + 4)
+                for arch in range(n_fat_arch):
                     # Read arch header
-                    cpu_type, cpu_sub_type, offset, size, align = read_data(
-                        file, BIG_ENDIAN, 5
+                    cpu_type, cpu_sub_type, arch_offset, size, align = _U32_BE_5.unpack_from(
+                        mm, offset + 8 + arch * 20
                     )
-                    do_file(file, offset, size)
+                    arch_end = arch_offset + size
+                    check_window(arch_offset, arch_end, offset, window_end, "fat arch")
+                    yield from do_file(mm, arch_offset, arch_end)
             elif magic == MH_MAGIC:
-                do_macho(file, 32, BIG_ENDIAN)
+                yield from do_macho(mm, offset, window_end, 32, BIG_ENDIAN)
             elif magic == MH_CIGAM:
-                do_macho(file, 32, LITTLE_ENDIAN)
+                yield from do_macho(mm, offset, window_end, 32, LITTLE_ENDIAN)
             elif magic == MH_MAGIC_64:
-                do_macho(file, 64, BIG_ENDIAN)
+                yield from do_macho(mm, offset, window_end, 64, BIG_ENDIAN)
             elif magic == MH_CIGAM_64:
-                do_macho(file, 64, LITTLE_ENDIAN)
+                yield from do_macho(mm, offset, window_end, 64, LITTLE_ENDIAN)
 
         assert len(what) >= len(value)
+        # names are compared and written as raw bytes, so they never need decoding
+        what_bytes = what.encode()
+        value_bytes = value.encode() + b"\0"
 
         with open(at_path, "r+b") as f:
-            do_file(f)
+            with mmap.mmap(f.fileno(), 0) as mm:
+                # scan every arch first, then patch all matches in one sweep and flush once
+                for start in list(do_file(mm, 0, min(len(mm), maxint))):
+                    mm[start : start + len(value_bytes)] = value_bytes
+                mm.flush()
 
     return mach_o_change
 
@@ -1,23 +1,16 @@
 """holds locking functionality that works across processes"""
 
-import logging
 import os
-from abc import ABCMeta, abstractmethod
 from contextlib import contextmanager
 from pathlib import Path
 from threading import Lock, RLock
+from weakref import WeakValueDictionary
 
 from ...filelock import FileLock, Timeout
 
 
 class _CountedFileLock(FileLock):
     def __init__(self, lock_file):
-        parent = os.path.dirname(lock_file)
-        if not os.path.isdir(parent):
-            try:
-                os.makedirs(parent)
-            except OSError:
-                pass
         super().__init__(lock_file)
         self.count = 0
         self.thread_safe = RLock()
@@ -25,6 +18,8 @@ class _CountedFileLock(FileLock):
     def acquire(self, timeout=None, poll_interval=0.05):
         with self.thread_safe:
             if self.count == 0:
+                # the folder can only be missing before the first hold, so reentrant acquires skip the syscall
+                os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
                 super().acquire(timeout, poll_interval)
             self.count += 1
 
@@ -35,93 +30,74 @@ class _CountedFileLock(FileLock):
             self.count = max(self.count - 1, 0)
 
 
-_lock_store = {}
+# entries vanish once no lock object holds on to them anymore
+_lock_store = WeakValueDictionary()
 _store_lock = Lock()
 
 
-class PathLockBase(metaclass=ABCMeta):
+class PathLockBase:
     def __init__(self, folder):
         path = Path(folder)
         self.path = path.resolve() if path.exists() else path
+        self._path_str = str(self.path)
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.path})"
 
+    @classmethod
+    def _from_resolved(cls, path):
+        """create a lock for a path derived from an already resolved one, skipping file system lookups"""
+        lock = cls.__new__(cls)
+        lock.path = path
+        lock._path_str = str(path)
+        return lock
+
     def __div__(self, other):
-        return type(self)(self.path / other)
+        return self._from_resolved(self.path / other)
 
     def __truediv__(self, other):
         return self.__div__(other)
 
-    @abstractmethod
     def __enter__(self):
         raise NotImplementedError
 
-    @abstractmethod
     def __exit__(self, exc_type, exc_val, exc_tb):  # noqa: U100
         raise NotImplementedError
 
-    @abstractmethod
     @contextmanager
     def lock_for_key(self, name, no_block=False):  # noqa: U100
         raise NotImplementedError
 
-    @abstractmethod
     @contextmanager
     def non_reentrant_lock_for_key(self, name):  # noqa: U100
         raise NotImplementedError
 
 
 class ReentrantFileLock(PathLockBase):
-    def __init__(self, folder):
-        super().__init__(folder)
-        self._lock = None
+    _lock = None
 
     def _create_lock(self, name=""):
-        lock_file = str(self.path / f"{name}.lock")
+        lock_file = os.path.join(self._path_str, name + ".lock")
         with _store_lock:
-            if lock_file not in _lock_store:
-                _lock_store[lock_file] = _CountedFileLock(lock_file)
-            return _lock_store[lock_file]
-
-    @staticmethod
-    def _del_lock(lock):
-        if lock is not None:
-            with _store_lock:
-                with lock.thread_safe:
-                    if lock.count == 0:
-                        _lock_store.pop(lock.lock_file, None)
-
-    def __del__(self):
-        self._del_lock(self._lock)
+            lock = _lock_store.get(lock_file)
+            if lock is None:
+                lock = _lock_store[lock_file] = _CountedFileLock(lock_file)
+            return lock
 
     def __enter__(self):
         self._lock = self._create_lock()
         self._lock_file(self._lock)
 
     def __exit__(self, exc_type, exc_val, exc_tb):  # noqa: U100
-        self._release(self._lock)
-        self._del_lock(self._lock)
-        self._lock = None
-
-    def _lock_file(self, lock, no_block=False):
-        # multiple processes might be trying to get a first lock... so we cannot check if this directory exist without
-        # a lock, but that lock might then become expensive, and it's not clear where that lock should live.
-        # Instead here we just ignore if we fail to create the directory.
-        try:
-            os.makedirs(str(self.path))
-        except OSError:
-            pass
-        try:
-            lock.acquire(0.0001)
-        except Timeout:
-            if no_block:
-                raise
-            logging.debug(
-                "lock file %s present, will block until released", lock.lock_file
-            )
-            lock.release()  # release the acquire try from above
-            lock.acquire()
+        lock = self._lock
+        self._release(lock)
+        if lock.count == 0:  # a nested with on the same instance still holds the lock
+            self._lock = None
+
+    @staticmethod
+    def _lock_file(lock, no_block=False):
+        # a failed acquire does not increment the hold count, so there is nothing to undo on Timeout
+        lock.acquire(0.0001 if no_block else None)
 
     @staticmethod
     def _release(lock):
@@ -130,28 +106,73 @@ class ReentrantFileLock(PathLockBase):
     @contextmanager
     def lock_for_key(self, name, no_block=False):
         lock = self._create_lock(name)
+        self._lock_file(lock, no_block)
+        try:
+            yield
+        finally:
+            self._release(lock)
+
+    @contextmanager
+    def non_reentrant_lock_for_key(self, name):
+        with _CountedFileLock(os.path.join(self._path_str, name + ".lock")):
+            yield
+
+
+# like _lock_store, entries vanish once no lock object holds on to them anymore
+_local_lock_store = WeakValueDictionary()
+
+
+class ProcessLocalLock(PathLockBase):
+    """locks for folders private to this process, taken without any file system locking"""
+
+    _lock = None
+
+    def _create_lock(self, name="", factory=RLock):
+        key = (os.path.join(self._path_str, name + ".lock"), factory)
+        with _store_lock:
+            lock = _local_lock_store.get(key)
+            if lock is None:
+                lock = _local_lock_store[key] = factory()
+            return lock
+
+    def _acquire(self, lock, blocking=True):
+        os.makedirs(self._path_str, exist_ok=True)
+        return lock.acquire(blocking)
+
+    def __enter__(self):
+        # the instance keeps the held lock alive, the store alone would let it be collected before __exit__
+        self._lock = self._create_lock()
+        self._acquire(self._lock)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):  # noqa: U100
+        self._lock.release()
+
+    @contextmanager
+    def lock_for_key(self, name, no_block=False):
+        lock = self._create_lock(name)
+        if not self._acquire(lock, not no_block):
+            raise Timeout(os.path.join(self._path_str, name + ".lock"))
         try:
-            try:
-                self._lock_file(lock, no_block)
-                yield
-            finally:
-                self._release(lock)
+            yield
         finally:
-            self._del_lock(lock)
-            lock = None
+            lock.release()
 
     @contextmanager
     def non_reentrant_lock_for_key(self, name):
-        with _CountedFileLock(str(self.path / f"{name}.lock")):
+        lock = self._create_lock(name, Lock)
+        self._acquire(lock)
+        try:
             yield
+        finally:
+            lock.release()
 
 
 class NoOpFileLock(PathLockBase):
     def __enter__(self):
-        raise NotImplementedError
+        return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):  # noqa: U100
-        raise NotImplementedError
+        return False
 
     @contextmanager
     def lock_for_key(self, name, no_block=False):  # noqa: U100
@@ -164,6 +185,7 @@ class NoOpFileLock(PathLockBase):
 
 __all__ = [
     "NoOpFileLock",
+    "ProcessLocalLock",
     "ReentrantFileLock",
     "Timeout",
 ]
@@ -21,6 +21,7 @@ import os
 import re
 import string
 from datetime import datetime
+from functools import lru_cache
 from textwrap import dedent
 
 from pybuilder import pip_utils
@@ -47,6 +48,8 @@ from pybuilder.utils import (
 use_plugin("python.core")
 
 LEADING_TAB_RE = re.compile(r"^(\t*)")
+# classifies a requirements file line as a comment ("#"), an editable URL ("-e", "--editable") or a requirement ("")
+REQUIREMENT_LINE_RE = re.compile(r"^\s*(?P<kind>#|-e(?=\s)|--editable(?=\s)|)\s*(?P<requirement>.*)$")
 DATA_FILES_PROPERTY = "distutils_data_files"
 SETUP_TEMPLATE = string.Template(
     """#!/usr/bin/env python
@@ -107,12 +110,6 @@ if __name__ == '__main__':
 )
 
 
-def default(value, default=""):
-    if value is None:
-        return default
-    return value
-
-
 def as_str(value):
     return repr(str(value))
 
@@ -251,15 +248,15 @@ def render_setup_script(project):
         else "distutils.core",
         "name": as_str(project.name),
         "version": as_str(project.dist_version),
-        "summary": as_str(default(project.summary)),
-        "description": as_str(default(project.description)),
+        "summary": as_str(project.summary or ""),
+        "description": as_str(project.description or ""),
         "description_content_type": repr(_get_description_content_type(project)),
         "author": as_str(author),
         "author_email": as_str(author_email),
         "maintainer": as_str(maintainer),
         "maintainer_email": as_str(maintainer_email),
-        "license": as_str(default(project.license)),
-        "url": as_str(default(project.url)),
+        "license": as_str(project.license or ""),
+        "url": as_str(project.url or ""),
         "project_urls": build_map_string(project.urls),
         "scripts": build_scripts_string(project),
         "packages": build_packages_string(project),
@@ -276,14 +273,10 @@ def render_setup_script(project):
             if project.get_property("distutils_issue8876_workaround_enabled")
             else ""
         ),
-        "preinstall_script": _normalize_setup_post_pre_script(
-            project.setup_preinstall_script or "pass"
-        ),
-        "postinstall_script": _normalize_setup_post_pre_script(
-            project.setup_postinstall_script or "pass"
-        ),
+        "preinstall_script": _render_install_script(project.setup_preinstall_script),
+        "postinstall_script": _render_install_script(project.setup_postinstall_script),
         "setup_keywords": build_setup_keywords(project),
-        "python_requires": as_str(default(project.requires_python)),
+        "python_requires": as_str(project.requires_python or ""),
         "obsoletes": build_string_from_array(project.obsoletes),
         "zip_safe": project.get_property("distutils_zip_safe"),
     }
@@ -352,13 +345,7 @@ def install_distribution(project, logger, reactor):
 @task("upload", description="Upload a project to PyPi.")
 def upload(project, logger, reactor):
     repository = project.get_property("distutils_upload_repository")
-    repository_args = []
-    if repository:
-        repository_args = ["--repository-url", repository]
-    else:
-        repository_key = project.get_property("distutils_upload_repository_key")
-        if repository_key:
-            repository_args = ["--repository", repository_key]
+    repository_args = _get_repository_args(project)
 
     upload_sign = project.get_property("distutils_upload_sign")
     sign_identity = project.get_property("distutils_upload_sign_identity")
@@ -399,6 +386,17 @@ def upload(project, logger, reactor):
     execute_twine(project, logger, reactor.pybuilder_venv, upload_cmd_args, "upload")
 
 
+def _get_repository_args(project):
+    # an explicit repository URL takes precedence over a repository key from .pypirc
+    repository = project.get_property("distutils_upload_repository")
+    if repository:
+        return ["--repository-url", repository]
+    repository_key = project.get_property("distutils_upload_repository_key")
+    if repository_key:
+        return ["--repository", repository_key]
+    return []
+
+
 def upload_check(project, logger, reactor):
     logger.info("Running Twine check for generated artifacts")
     execute_twine(project, logger, reactor.pybuilder_venv, [], "check")
@@ -430,34 +428,36 @@ def build_command_with_options(command, distutils_command_options=None):
 
 def execute_distutils(project, logger, python_env, distutils_commands, clean=False):
     reports_dir = _prepare_reports_dir(project)
-    setup_script = project.expand_path("$dir_dist", "setup.py")
+    if not distutils_commands:
+        return
+
+    dist_dir = project.expand_path("$dir_dist")
 
+    commands = python_env.executable + [os.path.join(dist_dir, "setup.py")]
+    if project.get_property("verbose"):
+        commands.append("-v")
+    if clean:
+        commands.extend(["clean", "--all"])
+
+    # setup.py runs every command on its command line in order, each followed by its own options,
+    # so all of them, compound ones included, share a single interpreter and a single log
     for command in distutils_commands:
         if is_string(command):
-            out_file = os.path.join(reports_dir, safe_log_file_name(command))
+            commands.extend(command.split())
         else:
-            out_file = os.path.join(reports_dir, safe_log_file_name("__".join(command)))
-        with open(out_file, "w") as out_f:
-            commands = python_env.executable + [setup_script]
-            if project.get_property("verbose"):
-                commands.append("-v")
-            if clean:
-                commands.extend(["clean", "--all"])
-            if is_string(command):
-                commands.extend(command.split())
-            else:
-                commands.extend(command)
-            logger.debug("Executing distutils command: %s", commands)
-            return_code = python_env.run_process_and_wait(
-                commands, project.expand_path("$dir_dist"), out_f
+            commands.extend(command)
+
+    out_file = os.path.join(reports_dir, safe_log_file_name("setup_py"))
+    with open(out_file, "w") as out_f:
+        logger.debug("Executing distutils command: %s", commands)
+        return_code = python_env.run_process_and_wait(commands, dist_dir, out_f)
+        if return_code != 0:
+            raise BuildFailedException(
+                "Error while executing setup command %s. See %s for full details:\n%s",
+                distutils_commands,
+                out_file,
+                tail_log(out_file),
             )
-            if return_code != 0:
-                raise BuildFailedException(
-                    "Error while executing setup command %s. See %s for full details:\n%s",
-                    command,
-                    out_file,
-                    tail_log(out_file),
-                )
 
 
 def execute_twine(project, logger, python_env, command_args, command):
@@ -508,6 +508,43 @@ def _execute_twine(project, logger, python_env, command, work_dir, out_file):
             )
 
 
+def _read_requirements(file_name):
+    """Returns the install requirements and the editable URLs listed in a requirements file"""
+    # both install_requires and dependency_links read every requirements file, parse each version of it only once
+    try:
+        stat = os.stat(file_name)
+    except OSError:
+        return _parse_requirements(file_name)
+    return _parse_requirements_cached(
+        os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size
+    )
+
+
+@lru_cache(maxsize=128)
+def _parse_requirements_cached(file_name, mtime_ns, size):
+    return _parse_requirements(file_name)
+
+
+def _parse_requirements(file_name):
+    install_requires = []
+    dependency_links = []
+    # comment lines have no target and are dropped
+    targets = {"": install_requires, "-e": dependency_links, "--editable": dependency_links}
+
+    with open(file_name, "r") as requirements_file:
+        for line in requirements_file.readlines():
+            match = REQUIREMENT_LINE_RE.match(line.strip("\n"))
+            target = targets.get(match.group("kind"))
+            requirement = match.group("requirement")
+            if target is not None and requirement:
+                target.append(requirement)
+
+    return tuple(install_requires), tuple(dependency_links)
+
+
+# the requirements helpers below are not used by the plugin anymore and are kept for existing callers
+
+
 def strip_comments(requirements):
     return [
         requirement
@@ -555,19 +592,8 @@ def build_install_dependencies_string(project):
         return "[]"
 
     dependencies = [format_single_dependency(dependency) for dependency in dependencies]
-    requirements = [
-        strip_comments(flatten_and_quote(requirement)) for requirement in requirements
-    ]
-    flattened_requirements = [
-        dependency for dependency_list in requirements for dependency in dependency_list
-    ]
-    flattened_requirements_without_editables = [
-        requirement
-        for requirement in flattened_requirements
-        if not is_editable_requirement(requirement)
-    ]
-
-    dependencies.extend(flattened_requirements_without_editables)
+    for requirement in requirements:
+        dependencies.extend(_read_requirements(requirement.name)[0])
 
     for i, dep in enumerate(dependencies):
         if dep.startswith('"') and dep.endswith('"'):
@@ -590,17 +616,7 @@ def build_dependency_links_string(project):
 
     editable_links_from_requirements = []
     for requirement in requirements:
-        editables = [
-            editable
-            for editable in flatten_and_quote(requirement)
-            if is_editable_requirement(editable)
-        ]
-        editable_links_from_requirements.extend(
-            [
-                editable.replace("--editable ", "").replace("-e ", "")
-                for editable in editables
-            ]
-        )
+        editable_links_from_requirements.extend(_read_requirements(requirement.name)[1])
 
     if not dependency_links and not requirements:
         return "[]"
@@ -641,16 +657,15 @@ def build_data_files_string(project):
     if not len(data_files):
         return "[]"
 
-    result = "[\n"
+    item_indent = " " * (indent + 4)
 
-    for dataType, dataFiles in data_files:
-        result += (" " * (indent + 4)) + "('%s', ['" % dataType
-        result += "', '".join(dataFiles)
-        result += "']),\n"
-
-    result = result[:-2] + "\n"
-    result += " " * indent + "]"
-    return result
+    return "[\n%s\n%s]" % (
+        ",\n".join(
+            "%s('%s', ['%s'])" % (item_indent, dataType, "', '".join(dataFiles))
+            for dataType, dataFiles in data_files
+        ),
+        " " * indent,
+    )
 
 
 def build_package_data_string(project):
@@ -659,22 +674,15 @@ def build_package_data_string(project):
         return "{}"
 
     indent = 8
+    item_indent = " " * (indent + 4)
 
-    sorted_keys = sorted(project.package_data.keys())
-
-    result = "{\n"
-
-    for pkgType in sorted_keys:
-        result += " " * (indent + 4)
-        result += "'%s': " % pkgType
-        result += "['"
-        result += "', '".join(package_data[pkgType])
-        result += "'],\n"
-
-    result = result[:-2] + "\n"
-    result += " " * indent + "}"
-
-    return result
+    return "{\n%s\n%s}" % (
+        ",\n".join(
+            "%s'%s': ['%s']" % (item_indent, package_name, "', '".join(package_data[package_name]))
+            for package_name in sorted(package_data.keys())
+        ),
+        " " * indent,
+    )
 
 
 def build_map_string(m):
@@ -683,18 +691,12 @@ def build_map_string(m):
 
     indent = 8
 
-    sorted_keys = sorted(m.keys())
-
-    result = "{\n"
-
-    for k in sorted_keys:
-        result += " " * (indent + 4)
-        result += "%r: %r,\n" % (k, m[k])
-
-    result = result[:-2] + "\n"
-    result += " " * indent + "}"
+    item_indent = " " * (indent + 4)
 
-    return result
+    return "{\n%s\n%s}" % (
+        ",\n".join("%s%r: %r" % (item_indent, k, m[k]) for k in sorted(m.keys())),
+        " " * indent,
+    )
 
 
 def build_namespace_packages_string(project):
@@ -727,20 +729,15 @@ def build_entry_points_string(project):
         return "{}"
 
     indent = 8
-    result = "{\n"
-
-    for k in sorted(entry_points.keys()):
-        result += " " * (indent + 4)
-        result += (
-            "'%s': %s"
-            % (k, build_string_from_array(as_list(entry_points[k]), indent + 8))
-            + ",\n"
-        )
+    item_indent = " " * (indent + 4)
 
-    result = result[:-2] + "\n"
-    result += (" " * indent) + "}"
-
-    return result
+    return "{\n%s\n%s}" % (
+        ",\n".join(
+            "%s'%s': %s" % (item_indent, k, build_string_from_array(as_list(entry_points[k]), indent + 8))
+            for k in sorted(entry_points.keys())
+        ),
+        " " * indent,
+    )
 
 
 def build_setup_keywords(project):
@@ -774,18 +771,16 @@ def build_string_from_array(arr, indent=12):
         else:
             result = "[[]]"
     elif len(arr) > 1:
-        result = "[\n"
-
-        for item in arr:
-            if is_notstr_iterable(item):
-                result += (
-                    (" " * indent) + build_string_from_array(item, indent + 4) + ",\n"
-                )
-            else:
-                result += (" " * indent) + "'" + item + "',\n"
-        result = result[:-2] + "\n"
-        result += " " * (indent - 4)
-        result += "]"
+        item_indent = " " * indent
+        result = "[\n%s\n%s]" % (
+            ",\n".join(
+                item_indent + build_string_from_array(item, indent + 4)
+                if is_notstr_iterable(item)
+                else "%s'%s'" % (item_indent, item)
+                for item in arr
+            ),
+            " " * (indent - 4),
+        )
     else:
         result = "[]"
 
@@ -800,17 +795,10 @@ def build_string_from_dict(d, indent=12):
     for k, v in d.items():
         map_elements.append("'%s': '%s'" % (k, v))
 
-    result = ""
+    if not map_elements:
+        return ""
 
-    if len(map_elements) > 0:
-        result += "{\n"
-        result += " " * indent
-        result += element_separator.join(map_elements)
-        result += "\n"
-        result += " " * (indent - 4)
-        result += "}"
-
-    return result
+    return "{\n%s%s\n%s}" % (" " * indent, element_separator.join(map_elements), " " * (indent - 4))
 
 
 def doc_convert(project, logger):
@@ -840,6 +828,15 @@ def _normalize_setup_post_pre_script(s, indent=8):
     )
 
 
+_DEFAULT_INSTALL_SCRIPT = _normalize_setup_post_pre_script("pass")
+
+
+def _render_install_script(script):
+    if not script:
+        return _DEFAULT_INSTALL_SCRIPT
+    return _normalize_setup_post_pre_script(script)
+
+
 def _prepare_reports_dir(project):
     reports_dir = project.expand_path("$dir_reports", "distutils")
     if not os.path.exists(reports_dir):
@@ -20,6 +20,7 @@
     Package vendorizer plugin.
     - Unpacks specified packages into specified directory
     - Relativizes all imports of the top-level package names
+    - Applies the local patches listed in vendorize_patches
 """
 
 import ast
@@ -31,8 +32,9 @@ from os.path import basename, dirname, exists, isdir, relpath, splitext
 from shutil import rmtree
 
 from pybuilder.core import Dependency, depends, init, task, use_plugin
+from pybuilder.errors import BuildFailedException
 from pybuilder.python_utils import iglob
-from pybuilder.utils import as_list, jp, makedirs, np
+from pybuilder.utils import as_list, execute_command, jp, makedirs, np
 
 __author__ = "Arcadiy Ivanov"
 
@@ -52,6 +54,7 @@ def initialize_vendorize_plugin(project):
     project.set_property_if_unset("vendorize_cleanup_globs", [])
     project.set_property_if_unset("vendorize_preserve_metadata", [])
     project.set_property_if_unset("vendorize_collect_licenses", True)
+    project.set_property_if_unset("vendorize_patches", [])
     project.set_property_if_unset(
         "vendorize_licenses", "$vendorize_target_dir/LICENSES"
     )
@@ -89,6 +92,12 @@ def vendorize(project, reactor, logger):
     # Vendorize
     _vendorize(target_dir, logger)
 
+    # Patch the relativized sources, patch paths are relative to the target directory
+    for patch_file in as_list(project.get_property("vendorize_patches")):
+        patch_file = project.expand_path(patch_file)
+        patch_log = project.expand_path("$dir_logs", "vendorize_%s.log" % basename(patch_file))
+        _apply_patch(patch_file, target_dir, patch_log, logger)
+
     if project.get_property("vendorize_collect_licenses"):
         licenses_content = ""
         for p in _list_metadata_dirs(target_dir):
@@ -150,6 +159,18 @@ def vendorize(project, reactor, logger):
         init_py.write("__names__ = %r\n" % sorted(cleaned_up_packages))
 
 
+def _apply_patch(patch_file, target_dir, log_file, logger):
+    logger.info("Applying vendorized package patch %r", patch_file)
+    if execute_command(
+        ["patch", "-p1", "-N", "-d", target_dir, "-i", patch_file],
+        log_file,
+        logger=logger,
+    ):
+        raise BuildFailedException(
+            "Unable to apply patch %s to %s, see %s", patch_file, target_dir, log_file
+        )
+
+
 def _relpkg_import(pkg_parts):
     return "." * len(pkg_parts)
 
@@ -16,22 +16,23 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-try:
-    TYPE_FILE = file
-except NameError:
-    from io import FileIO
-
-    TYPE_FILE = FileIO
-
+import os
+import shutil
+import tempfile
 import unittest
+from copy import deepcopy
+from functools import lru_cache
 
 from test_utils import ANY, MagicMock, Mock, PyBuilderTestCase, call, patch
 
-from pybuilder.core import Author, Logger, Project
+from pybuilder.core import Author, Project
 from pybuilder.errors import BuildFailedException
 from pybuilder.pip_utils import PIP_MODULE_STANZA
+from pybuilder.plugins.python import distutils_plugin
 from pybuilder.plugins.python.distutils_plugin import (
+    _get_repository_args,
     _normalize_setup_post_pre_script,
+    _parse_requirements,
     build_binary_distribution,
     build_data_files_string,
     build_dependency_links_string,
@@ -42,16 +43,33 @@ from pybuilder.plugins.python.distutils_plugin import (
     build_scripts_string,
     build_setup_keywords,
     build_string_from_array,
-    default,
     execute_distutils,
+    flatten_and_quote,
     initialize_distutils_plugin,
     install_distribution,
+    is_editable_requirement,
     render_manifest_file,
     render_setup_script,
     upload,
 )
 from pybuilder.utils import np
 
+try:
+    TYPE_FILE = file
+except NameError:
+    from io import FileIO
+
+    TYPE_FILE = FileIO
+
+# introspecting the file type for its attributes is the slow part of a spec'ed mock, do it only once
+_FILE_SPEC = dir(TYPE_FILE)
+
+# only passed through to the plugin, never asserted against
+_NOOP_LOGGER = Mock()
+
+_EXECUTABLE = ["a/b"]
+_TWINE_COMMAND = _EXECUTABLE + ["-m", "twine"]
+
 
 class InstallDependenciesTest(unittest.TestCase):
     def setUp(self):
@@ -128,11 +146,9 @@ class InstallDependenciesTest(unittest.TestCase):
             "['spam==0.7']", build_install_dependencies_string(self.project)
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_quote_requirements(self, mock_open):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = ["foo", "bar"]
+        mock_requirements_file(mock_open, ["foo", "bar"])
         self.project.depends_on_requirements("requirements.txt")
 
         self.assertEqual(
@@ -140,11 +156,9 @@ class InstallDependenciesTest(unittest.TestCase):
             build_install_dependencies_string(self.project),
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_ignore_empty_requirement_lines(self, mock_open):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = ["", "foo", "bar"]
+        mock_requirements_file(mock_open, ["", "foo", "bar"])
         self.project.depends_on_requirements("requirements.txt")
 
         self.assertEqual(
@@ -152,51 +166,85 @@ class InstallDependenciesTest(unittest.TestCase):
             build_install_dependencies_string(self.project),
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_ignore_comments_from_requirements(self, mock_open):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = ["#comment", "bar"]
+        mock_requirements_file(mock_open, ["#comment", "bar"])
         self.project.depends_on_requirements("requirements.txt")
 
         self.assertEqual("['bar']", build_install_dependencies_string(self.project))
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_ignore_comments_with_leading_space_from_requirements(
         self, mock_open
     ):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = [" # comment", "bar"]
+        mock_requirements_file(mock_open, [" # comment", "bar"])
         self.project.depends_on_requirements("requirements.txt")
 
         self.assertEqual("['bar']", build_install_dependencies_string(self.project))
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_ignore_editable_urls_from_requirements(self, mock_open):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = [
-            "foo",
-            "-e git+https://github.com/someuser/someproject.git#egg=some_package",
-        ]
+        mock_requirements_file(
+            mock_open,
+            [
+                "foo",
+                "-e git+https://github.com/someuser/someproject.git#egg=some_package",
+            ],
+        )
         self.project.depends_on_requirements("requirements.txt")
 
         self.assertEqual("['foo']", build_install_dependencies_string(self.project))
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_ignore_expanded_editable_urls_from_requirements(self, mock_open):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = [
-            "foo",
-            "--editable git+https://github.com/someuser/someproject.git#egg=some_package",
-        ]
+        mock_requirements_file(
+            mock_open,
+            [
+                "foo",
+                "--editable git+https://github.com/someuser/someproject.git#egg=some_package",
+            ],
+        )
         self.project.depends_on_requirements("requirements.txt")
 
         self.assertEqual("['foo']", build_install_dependencies_string(self.project))
 
 
+class RequirementsFileCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.basedir = tempfile.mkdtemp(self.__class__.__name__)
+        self.requirements_file = os.path.join(self.basedir, "requirements.txt")
+        self.project = Project(self.basedir)
+        self.project.depends_on_requirements(self.requirements_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.basedir)
+
+    def write_requirements(self, content):
+        with open(self.requirements_file, "w") as f:
+            f.write(content)
+
+    @patch.object(distutils_plugin, "_parse_requirements", wraps=_parse_requirements)
+    def test_should_parse_unchanged_requirements_file_once(self, parse_requirements):
+        self.write_requirements("foo\n-e git+https://github.com/someuser/someproject.git#egg=bar\n")
+
+        self.assertEqual("['foo']", build_install_dependencies_string(self.project))
+        self.assertEqual(
+            "['git+https://github.com/someuser/someproject.git#egg=bar']",
+            build_dependency_links_string(self.project),
+        )
+        parse_requirements.assert_called_once_with(os.path.abspath(self.requirements_file))
+
+    def test_should_parse_requirements_file_again_when_changed(self):
+        self.write_requirements("foo\n")
+        self.assertEqual("['foo']", build_install_dependencies_string(self.project))
+
+        self.write_requirements("foo\n# comment\nbar\n")
+        self.assertEqual(
+            "[\n            'foo',\n            'bar'\n        ]",
+            build_install_dependencies_string(self.project),
+        )
+
+
 class DependencyLinksTest(unittest.TestCase):
     def setUp(self):
         self.project = Project(".")
@@ -230,16 +278,17 @@ class DependencyLinksTest(unittest.TestCase):
             build_dependency_links_string(self.project),
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_use_editable_urls_from_requirements_as_dependency_links(
         self, mock_open
     ):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = [
-            "-e git+https://github.com/someuser/someproject.git#egg=some_package",
-            "-e svn+https://github.com/someuser/someproject#egg=some_package",
-        ]
+        mock_requirements_file(
+            mock_open,
+            [
+                "-e git+https://github.com/someuser/someproject.git#egg=some_package",
+                "-e svn+https://github.com/someuser/someproject#egg=some_package",
+            ],
+        )
         self.project.depends_on_requirements("requirements.txt")
 
         self.assertEqual(
@@ -249,16 +298,17 @@ class DependencyLinksTest(unittest.TestCase):
             build_dependency_links_string(self.project),
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_use_expanded_editable_urls_from_requirements_as_dependency_links(
         self, mock_open
     ):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = [
-            "--editable git+https://github.com/someuser/someproject.git#egg=some_package",
-            "--editable svn+https://github.com/someuser/someproject#egg=some_package",
-        ]
+        mock_requirements_file(
+            mock_open,
+            [
+                "--editable git+https://github.com/someuser/someproject.git#egg=some_package",
+                "--editable svn+https://github.com/someuser/someproject#egg=some_package",
+            ],
+        )
         self.project.depends_on_requirements("requirements.txt")
 
         self.assertEqual(
@@ -268,15 +318,33 @@ class DependencyLinksTest(unittest.TestCase):
             build_dependency_links_string(self.project),
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
+    def test_should_use_indented_editable_urls_from_requirements_as_dependency_links(
+        self, mock_open
+    ):
+        mock_requirements_file(
+            mock_open,
+            [
+                "foo",
+                "  -e  git+https://github.com/someuser/someproject.git#egg=some_package",
+                "   ",
+            ],
+        )
+        self.project.depends_on_requirements("requirements.txt")
+
+        self.assertEqual(
+            "['git+https://github.com/someuser/someproject.git#egg=some_package']",
+            build_dependency_links_string(self.project),
+        )
+        self.assertEqual("['foo']", build_install_dependencies_string(self.project))
+
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_use_editable_urls_from_requirements_combined_with_url_dependencies(
         self, mock_open
     ):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = [
-            "-e svn+https://github.com/someuser/someproject#egg=some_package"
-        ]
+        mock_requirements_file(
+            mock_open, ["-e svn+https://github.com/someuser/someproject#egg=some_package"]
+        )
         self.project.depends_on("jedi", url="git+https://github.com/davidhalter/jedi")
         self.project.depends_on_requirements("requirements.txt")
 
@@ -288,20 +356,6 @@ class DependencyLinksTest(unittest.TestCase):
         )
 
 
-class DefaultTest(unittest.TestCase):
-    def test_should_return_empty_string_as_default_when_given_value_is_none(self):
-        self.assertEqual("", default(None))
-
-    def test_should_return_given_default_when_given_value_is_none(self):
-        self.assertEqual("default", default(None, default="default"))
-
-    def test_should_return_value_string_when_value_given(self):
-        self.assertEqual("value", default("value"))
-
-    def test_should_return_value_string_when_value_and_default_given(self):
-        self.assertEqual("value", default("value", default="default"))
-
-
 class BuildDataFilesStringTest(unittest.TestCase):
     def setUp(self):
         self.project = Project(".")
@@ -399,6 +453,15 @@ class BuildPackageDataStringTest(unittest.TestCase):
             build_package_data_string(self.project),
         )
 
+    def test_should_render_package_data_added_directly_to_the_project(self):
+        self.project.include_file("spam", "egg")
+        self.project.package_data["ham"] = ["eggs"]
+
+        self.assertEqual(
+            "{\n" "            'ham': ['eggs'],\n" "            'spam': ['egg']\n" "        }",
+            build_package_data_string(self.project),
+        )
+
 
 class RenderSetupScriptTest(PyBuilderTestCase):
     def setUp(self):
@@ -697,13 +760,11 @@ if __name__ == '__main__':
             actual_setup_script,
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_render_runtime_dependencies_when_requirements_file_used(
         self, mock_open
     ):
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
-        handle = mock_open.return_value.__enter__.return_value
-        handle.readlines.return_value = ["", "foo", "bar"]
+        mock_requirements_file(mock_open, ["", "foo", "bar"])
         self.project.depends_on_requirements("requirements.txt")
 
         actual_setup_script = build_install_dependencies_string(self.project)
@@ -782,6 +843,14 @@ class UtilityMethodTest(PyBuilderTestCase):
             build_string_from_array([["a", "b"], ["c", "d"]]),
         )
 
+    @patch.object(distutils_plugin, "open", create=True)
+    def test_flatten_and_quote_keeps_editable_requirements(self, mock_open):
+        mock_requirements_file(mock_open, ["foo", "", " # comment", "-e git+https://x/y.git#egg=y"])
+        requirements = flatten_and_quote(Mock(name="requirements.txt"))
+
+        self.assertEqual(['"foo"', '"-e git+https://x/y.git#egg=y"'], requirements)
+        self.assertEqual([False, True], [is_editable_requirement(r) for r in requirements])
+
 
 class RenderManifestFileTest(unittest.TestCase):
     def test_should_render_manifest_file(self):
@@ -810,262 +879,150 @@ class ExecuteDistUtilsTest(PyBuilderTestCase):
         self.pyb_env.env_dir = "a"
         self.pyb_env.run_process_and_wait.return_value = 0
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
+    @patch.object(distutils_plugin.os, "mkdir")
+    @patch.object(distutils_plugin, "open", create=True)
     def test_should_accept_array_of_simple_commands(self, *_):
         commands = ["a", "b", "c"]
 
-        execute_distutils(self.project, MagicMock(Logger), self.pyb_env, commands)
+        execute_distutils(self.project, _NOOP_LOGGER, self.pyb_env, commands)
 
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [call(self.pyb_env.executable + [ANY, cmd], ANY, ANY) for cmd in commands]
+        self.pyb_env.run_process_and_wait.assert_called_once_with(
+            self.pyb_env.executable + [ANY] + commands, ANY, ANY
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    def test_should_accept_array_of_compound_commands(self, *_):
-        commands = ["a", "b", "c"]
+    @patch.object(distutils_plugin.os, "mkdir")
+    @patch.object(distutils_plugin, "open", create=True)
+    def test_should_run_simple_and_compound_commands_in_one_invocation(self, open_mock, *_):
+        commands = ["a --x", "b", ["c", "--y"], "d"]
 
-        execute_distutils(self.project, MagicMock(Logger), self.pyb_env, [commands])
+        execute_distutils(self.project, _NOOP_LOGGER, self.pyb_env, commands)
 
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [call(self.pyb_env.executable + [ANY] + commands, ANY, ANY)]
+        self.assertEqual(
+            [call(self.pyb_env.executable + [ANY, "a", "--x", "b", "c", "--y", "d"], ANY, ANY)],
+            self.pyb_env.run_process_and_wait.call_args_list,
         )
-
-
-class UploadTests(PyBuilderTestCase):
-    def setUp(self):
-        self.project = create_project()
-        self.project.set_property("dir_reports", "whatever reports")
-        self.project.set_property("dir_dist", "whatever dist")
-
-        self.reactor = Mock()
-        self.pyb_env = Mock()
-        self.pyb_env.executable = ["a/b"]
-        self.pyb_env.env_dir = "a"
-        self.pyb_env.run_process_and_wait.return_value = 0
-        self.reactor.python_env_registry = {"pybuilder": self.pyb_env}
-        self.reactor.pybuilder_venv = self.pyb_env
-
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_upload_with_register(self, walk, *_):
-        walk.return_value = [["dist", "", ["a", "b"]]]
-
-        self.project.set_property("distutils_upload_register", True)
-
-        upload(self.project, MagicMock(Logger), self.reactor)
-
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "register",
-                        self.project.expand_path("$dir_dist", "dist", "a"),
-                    ],
-                    ANY,
-                    ANY,
-                ),
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "register",
-                        self.project.expand_path("$dir_dist", "dist", "b"),
-                    ],
-                    ANY,
-                    ANY,
-                ),
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "upload",
-                        self.project.expand_path("$dir_dist", "dist", "a"),
-                        self.project.expand_path("$dir_dist", "dist", "b"),
-                    ],
-                    ANY,
-                    ANY,
-                ),
-            ]
+        open_mock.assert_called_once_with(
+            os.path.join(self.project.expand_path("$dir_reports", "distutils"), "setup_py"), "w"
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_upload(self, walk, *_):
-        walk.return_value = [["dist", "", ["a", "b"]]]
+    @patch.object(distutils_plugin.os, "mkdir")
+    @patch.object(distutils_plugin, "open", create=True)
+    def test_should_not_run_setup_script_without_commands(self, *_):
+        execute_distutils(self.project, _NOOP_LOGGER, self.pyb_env, [])
 
-        upload(self.project, MagicMock(Logger), self.reactor)
+        self.pyb_env.run_process_and_wait.assert_not_called()
 
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "upload",
-                        self.project.expand_path("$dir_dist", "dist", "a"),
-                        self.project.expand_path("$dir_dist", "dist", "b"),
-                    ],
-                    ANY,
-                    ANY,
-                )
-            ]
-        )
-
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_upload_with_repo(self, walk, *_):
-        walk.return_value = [["dist", "", ["a", "b"]]]
-        self.project.set_property("distutils_upload_repository", "test repo")
+    @patch.object(distutils_plugin.os, "mkdir")
+    @patch.object(distutils_plugin, "open", create=True)
+    def test_should_accept_array_of_compound_commands(self, *_):
+        commands = ["a", "b", "c"]
 
-        upload(self.project, MagicMock(Logger), self.reactor)
+        execute_distutils(self.project, _NOOP_LOGGER, self.pyb_env, [commands])
 
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "upload",
-                        "--repository-url",
-                        "test repo",
-                        self.project.expand_path("$dir_dist", "dist", "a"),
-                        self.project.expand_path("$dir_dist", "dist", "b"),
-                    ],
-                    ANY,
-                    ANY,
-                )
-            ]
+        self.assertEqual(
+            [call(self.pyb_env.executable + [ANY] + commands, ANY, ANY)],
+            self.pyb_env.run_process_and_wait.call_args_list,
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_upload_with_repo_and_repo_key(self, walk, *_):
-        walk.return_value = [["dist", "", ["a", "b"]]]
-        self.project.set_property("distutils_upload_repository", "test repo")
-        self.project.set_property("distutils_upload_repository_key", "test repo key")
 
-        upload(self.project, MagicMock(Logger), self.reactor)
+class _FileSystemPatchesMixin:
+    """Patches the plugin's mkdir, open and walk for every test, the file system is never touched for real."""
 
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "upload",
-                        "--repository-url",
-                        "test repo",
-                        self.project.expand_path("$dir_dist", "dist", "a"),
-                        self.project.expand_path("$dir_dist", "dist", "b"),
-                    ],
-                    ANY,
-                    ANY,
-                )
-            ]
-        )
+    walk_result = []
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_upload_with_repo_key_only(self, walk, *_):
-        walk.return_value = [["dist", "", ["a", "b"]]]
-        self.project.set_property("distutils_upload_repository_key", "test repo key")
+    def setUp(self):
+        super().setUp()
+        for patcher in (
+            patch.object(distutils_plugin.os, "mkdir"),
+            patch.object(distutils_plugin, "open", create=True),
+            patch.object(distutils_plugin.os, "walk", return_value=self.walk_result),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
-        upload(self.project, MagicMock(Logger), self.reactor)
 
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "upload",
-                        "--repository",
-                        "test repo key",
-                        self.project.expand_path("$dir_dist", "dist", "a"),
-                        self.project.expand_path("$dir_dist", "dist", "b"),
-                    ],
-                    ANY,
-                    ANY,
-                )
-            ]
-        )
+class UploadTests(_FileSystemPatchesMixin, PyBuilderTestCase):
+    walk_result = [["dist", "", ["a", "b"]]]
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_upload_with_signature(self, walk, *_):
-        walk.return_value = [["dist", "", ["a", "b"]]]
-        self.project.set_property("distutils_upload_sign", True)
+    def setUp(self):
+        super().setUp()
+        self.project = create_project()
+        self.project.set_property("dir_reports", "whatever reports")
+        self.project.set_property("dir_dist", "whatever dist")
+        self.dist_a = self.project.expand_path("$dir_dist", "dist", "a")
+        self.dist_b = self.project.expand_path("$dir_dist", "dist", "b")
+
+    def upload_with_properties(self, properties):
+        project = deepcopy(self.project)
+        for key, value in properties.items():
+            project.set_property(key, value)
+
+        reactor = Mock()
+        pyb_env = Mock()
+        pyb_env.executable = _EXECUTABLE
+        pyb_env.env_dir = "a"
+        pyb_env.run_process_and_wait.return_value = 0
+        reactor.python_env_registry = {"pybuilder": pyb_env}
+        reactor.pybuilder_venv = pyb_env
+
+        upload(project, _NOOP_LOGGER, reactor)
+
+        return pyb_env
+
+    def test_upload_variants(self):
+        dist_files = [self.dist_a, self.dist_b]
+        cases = [
+            ({}, [["upload"] + dist_files]),
+            (
+                {"distutils_upload_register": True},
+                [
+                    ["register", self.dist_a],
+                    ["register", self.dist_b],
+                    ["upload"] + dist_files,
+                ],
+            ),
+            (
+                {"distutils_upload_repository": "test repo"},
+                [["upload", "--repository-url", "test repo"] + dist_files],
+            ),
+            (
+                {"distutils_upload_repository_key": "test repo key"},
+                [["upload", "--repository", "test repo key"] + dist_files],
+            ),
+            (
+                {"distutils_upload_sign": True},
+                [["upload", "--sign"] + dist_files],
+            ),
+            (
+                {
+                    "distutils_upload_sign": True,
+                    "distutils_upload_sign_identity": "abcd",
+                },
+                [["upload", "--sign", "--identity", "abcd"] + dist_files],
+            ),
+        ]
 
-        upload(self.project, MagicMock(Logger), self.reactor)
+        for properties, twine_arguments in cases:
+            with self.subTest(properties=properties):
+                pyb_env = self.upload_with_properties(properties)
 
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "upload",
-                        "--sign",
-                        self.project.expand_path("$dir_dist", "dist", "a"),
-                        self.project.expand_path("$dir_dist", "dist", "b"),
-                    ],
-                    ANY,
-                    ANY,
-                )
-            ]
-        )
+                commands = [args[0] for args, _ in pyb_env.run_process_and_wait.call_args_list]
+                prefix_length = len(_TWINE_COMMAND)
+                self.assertEqual([_TWINE_COMMAND] * len(commands), [command[:prefix_length] for command in commands])
+                self.assertEqual(twine_arguments, [command[prefix_length:] for command in commands])
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_upload_with_signature_and_identity(self, walk, *_):
-        walk.return_value = [["dist", "", ["a", "b"]]]
-        self.project.set_property("distutils_upload_sign", True)
-        self.project.set_property("distutils_upload_sign_identity", "abcd")
+    def test_repository_url_takes_precedence_over_repository_key(self):
+        self.project.set_property("distutils_upload_repository", "test repo")
+        self.project.set_property("distutils_upload_repository_key", "test repo key")
 
-        upload(self.project, MagicMock(Logger), self.reactor)
+        self.assertEqual(["--repository-url", "test repo"], _get_repository_args(self.project))
 
-        self.pyb_env.run_process_and_wait.assert_has_calls(
-            [
-                call(
-                    self.pyb_env.executable
-                    + [
-                        "-m",
-                        "twine",
-                        "upload",
-                        "--sign",
-                        "--identity",
-                        "abcd",
-                        self.project.expand_path("$dir_dist", "dist", "a"),
-                        self.project.expand_path("$dir_dist", "dist", "b"),
-                    ],
-                    ANY,
-                    ANY,
-                )
-            ]
-        )
 
+class TasksTest(_FileSystemPatchesMixin, PyBuilderTestCase):
+    walk_result = [("root", (), ("file1", "file2"))]
 
-class TasksTest(PyBuilderTestCase):
     def setUp(self):
+        super().setUp()
         self.project = create_project()
         self.project.set_property("dir_reports", "whatever reports")
         self.project.set_property("dir_dist", "whatever dist")
@@ -1078,16 +1035,18 @@ class TasksTest(PyBuilderTestCase):
         self.pyb_env.run_process_and_wait.return_value = 0
         self.reactor.python_env_registry = {"system": self.pyb_env}
         self.reactor.pybuilder_venv = self.pyb_env
+        self.dist_dir = self.project.expand_path("$dir_dist")
+        self.dist_file1 = self.project.expand_path("$dir_dist", "dist", "file1")
+        self.dist_file2 = self.project.expand_path("$dir_dist", "dist", "file2")
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
     @patch("pybuilder.pip_utils.open", create=True)
     def test_install(self, *_):
-        install_distribution(self.project, MagicMock(Logger), self.reactor)
+        install_distribution(self.project, _NOOP_LOGGER, self.reactor)
 
         self.pyb_env.execute_command.assert_called_with(
             self.pyb_env.executable
             + PIP_MODULE_STANZA
-            + ["install", "--force-reinstall", self.project.expand_path("$dir_dist")],
+            + ["install", "--force-reinstall", self.dist_dir],
             cwd=".",
             env=ANY,
             outfile_name=ANY,
@@ -1096,7 +1055,6 @@ class TasksTest(PyBuilderTestCase):
             no_path_search=True,
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
     @patch("pybuilder.pip_utils.open", create=True)
     def test_install_with_index_url(self, *_):
         self.project.set_property("install_dependencies_index_url", "index_url")
@@ -1104,7 +1062,7 @@ class TasksTest(PyBuilderTestCase):
             "install_dependencies_extra_index_url", "extra_index_url"
         )
 
-        install_distribution(self.project, MagicMock(Logger), self.reactor)
+        install_distribution(self.project, _NOOP_LOGGER, self.reactor)
 
         self.pyb_env.execute_command.assert_called_with(
             self.pyb_env.executable
@@ -1116,7 +1074,7 @@ class TasksTest(PyBuilderTestCase):
                 "--extra-index-url",
                 "extra_index_url",
                 "--force-reinstall",
-                self.project.expand_path("$dir_dist"),
+                self.dist_dir,
             ],
             cwd=".",
             env=ANY,
@@ -1126,21 +1084,14 @@ class TasksTest(PyBuilderTestCase):
             no_path_search=True,
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_binary_distribution(self, walk, *_):
-        walk.return_value = [("root", (), ("file1", "file2"))]
+    def test_binary_distribution(self):
+        build_binary_distribution(self.project, _NOOP_LOGGER, self.reactor)
 
-        build_binary_distribution(self.project, MagicMock(Logger), self.reactor)
-
-        self.pyb_env.run_process_and_wait.assert_has_calls(
+        self.assertEqual(
             [
                 call(
-                    self.pyb_env.executable + [ANY, "clean", "--all", "sdist"], ANY, ANY
-                ),
-                call(
-                    self.pyb_env.executable + [ANY, "clean", "--all", "bdist_dumb"],
+                    self.pyb_env.executable
+                    + [ANY, "clean", "--all", "sdist", "bdist_dumb"],
                     ANY,
                     ANY,
                 ),
@@ -1150,37 +1101,39 @@ class TasksTest(PyBuilderTestCase):
                         "-m",
                         "twine",
                         "check",
-                        self.project.expand_path("$dir_dist", "dist", "file1"),
-                        self.project.expand_path("$dir_dist", "dist", "file2"),
+                        self.dist_file1,
+                        self.dist_file2,
                     ],
                     ANY,
                     ANY,
                 ),
-            ]
+            ],
+            self.pyb_env.run_process_and_wait.call_args_list,
         )
 
-    @patch("pybuilder.plugins.python.distutils_plugin.os.mkdir")
-    @patch("pybuilder.plugins.python.distutils_plugin.open", create=True)
-    @patch("pybuilder.plugins.python.distutils_plugin.os.walk")
-    def test_binary_distribution_with_command_options(self, walk, *_):
+    def test_binary_distribution_runs_setup_script_once(self):
+        self.project.set_property("distutils_commands", ["sdist", "bdist_wheel", "bdist_dumb"])
+
+        build_binary_distribution(self.project, _NOOP_LOGGER, self.reactor)
+
+        setup_script = np(self.project.expand_path("$dir_dist", "setup.py"))
+        setup_runs = [
+            args[0] for args, _ in self.pyb_env.run_process_and_wait.call_args_list if setup_script in args[0]
+        ]
+        self.assertEqual([["clean", "--all", "sdist", "bdist_wheel", "bdist_dumb"]], [run[2:] for run in setup_runs])
+
+    def test_binary_distribution_with_command_options(self):
         self.project.set_property(
             "distutils_command_options", {"sdist": ["--formats", "bztar"]}
         )
 
-        walk.return_value = [("root", (), ("file1", "file2"))]
+        build_binary_distribution(self.project, _NOOP_LOGGER, self.reactor)
 
-        build_binary_distribution(self.project, MagicMock(Logger), self.reactor)
-
-        self.pyb_env.run_process_and_wait.assert_has_calls(
+        self.assertEqual(
             [
                 call(
                     self.pyb_env.executable
-                    + [ANY, "clean", "--all", "sdist", "--formats", "bztar"],
-                    ANY,
-                    ANY,
-                ),
-                call(
-                    self.pyb_env.executable + [ANY, "clean", "--all", "bdist_dumb"],
+                    + [ANY, "clean", "--all", "sdist", "--formats", "bztar", "bdist_dumb"],
                     ANY,
                     ANY,
                 ),
@@ -1190,13 +1143,14 @@ class TasksTest(PyBuilderTestCase):
                         "-m",
                         "twine",
                         "check",
-                        self.project.expand_path("$dir_dist", "dist", "file1"),
-                        self.project.expand_path("$dir_dist", "dist", "file2"),
+                        self.dist_file1,
+                        self.dist_file2,
                     ],
                     ANY,
                     ANY,
                 ),
-            ]
+            ],
+            self.pyb_env.run_process_and_wait.call_args_list,
         )
 
 
@@ -1205,7 +1159,21 @@ def popen_distutils_args(self, call_count, proc_runner):
     return [call_args[0][0][2:] for call_args in proc_runner.call_args_list]
 
 
+def mock_requirements_file(mock_open, lines):
+    # parsed files are cached by their real stat, which says nothing about the mocked content
+    distutils_plugin._parse_requirements_cached.cache_clear()
+    mock_open.return_value = MagicMock(spec=_FILE_SPEC)
+    handle = mock_open.return_value.__enter__.return_value
+    handle.readlines.return_value = lines
+
+
 def create_project():
+    # building the project runs dependency and property registration, copying the prototype is several times cheaper
+    return deepcopy(_project_prototype())
+
+
+@lru_cache(maxsize=None)
+def _project_prototype():
     project = Project("/")
     project.build_depends_on("testingframework")
     project.depends_on("sometool")
@@ -20,24 +20,23 @@ from unittest import TestCase
 
 from test_utils import Mock
 
-from pybuilder.core import Logger, Project
+from pybuilder.core import Project
 from pybuilder.plugins.python.pep8_plugin import (
     check_pep8_available,
     init_pep8_properties,
 )
 
+_NOOP_LOGGER = Mock()
+
 
 class CheckPep8AvailableTests(TestCase):
     def test_should_check_that_pylint_can_be_executed(self):
-        mock_project = Mock(Project)
-        mock_logger = Mock(Logger)
-
         reactor = Mock()
         pyb_env = Mock()
         reactor.python_env_registry = {"pybuilder": pyb_env}
         reactor.pybuilder_venv = pyb_env
 
-        check_pep8_available(mock_project, mock_logger, reactor)
+        check_pep8_available(Mock(), _NOOP_LOGGER, reactor)
 
         expected_command_line = [
             "pep8",
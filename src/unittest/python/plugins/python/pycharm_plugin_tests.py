@@ -16,11 +16,6 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-try:
-    TYPE_FILE = file
-except NameError:
-    from io import FileIO as TYPE_FILE
-
 import unittest
 from os import sep
 
@@ -33,6 +28,30 @@ from pybuilder.plugins.python.pycharm_plugin import (
 )
 from pybuilder.utils import jp, np
 
+_EXPECTED_IML_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<!-- This file has been generated by the PyBuilder PyCharm Plugin -->
+
+<module type="PYTHON_MODULE" version="4">
+  <component name="NewModuleRootManager">
+    <content url="file://$MODULE_DIR$">
+      <sourceFolder url="file://$MODULE_DIR$/src/main/python" isTestSource="false" />
+      <sourceFolder url="file://$MODULE_DIR$/src/unittest/python" isTestSource="true" />
+      <sourceFolder url="file://$MODULE_DIR$/src/integrationtest/python" isTestSource="true" />
+      <excludeFolder url="file://$MODULE_DIR$/.pybuilder" />
+      <excludeFolder url="file://$MODULE_DIR$/build" />
+    </content>
+    <orderEntry type="inheritedJdk" />
+    <orderEntry type="sourceFolder" forTests="false" />
+  </component>
+  <component name="PyDocumentationSettings">
+    <option name="myDocStringFormat" value="Plain" />
+  </component>
+  <component name="TestRunnerService">
+    <option name="projectConfiguration" value="Unittests" />
+    <option name="PROJECT_TEST_RUNNER" value="Unittests" />
+  </component>
+</module>"""
+
 
 class PycharmPluginTests(unittest.TestCase):
     @patch("pybuilder.plugins.python.pycharm_plugin.os")
@@ -61,7 +80,7 @@ class PycharmPluginTests(unittest.TestCase):
             "dir_source_integrationtest_python", "src/integrationtest/python"
         )
         project.set_property("dir_target", "build")
-        mock_open.return_value = MagicMock(spec=TYPE_FILE)
+        mock_open.return_value = MagicMock()
         os.path.join.side_effect = lambda first, second: first + sep + second
 
         pycharm_generate(project, Mock())
@@ -70,28 +89,4 @@ class PycharmPluginTests(unittest.TestCase):
             np(jp(project.basedir, ".idea/pybuilder.iml")), "w"
         )
         metadata_file = mock_open.return_value.__enter__.return_value
-        metadata_file.write.assert_called_with(
-            """<?xml version="1.0" encoding="UTF-8"?>
-<!-- This file has been generated by the PyBuilder PyCharm Plugin -->
-
-<module type="PYTHON_MODULE" version="4">
-  <component name="NewModuleRootManager">
-    <content url="file://$MODULE_DIR$">
-      <sourceFolder url="file://$MODULE_DIR$/src/main/python" isTestSource="false" />
-      <sourceFolder url="file://$MODULE_DIR$/src/unittest/python" isTestSource="true" />
-      <sourceFolder url="file://$MODULE_DIR$/src/integrationtest/python" isTestSource="true" />
-      <excludeFolder url="file://$MODULE_DIR$/.pybuilder" />
-      <excludeFolder url="file://$MODULE_DIR$/build" />
-    </content>
-    <orderEntry type="inheritedJdk" />
-    <orderEntry type="sourceFolder" forTests="false" />
-  </component>
-  <component name="PyDocumentationSettings">
-    <option name="myDocStringFormat" value="Plain" />
-  </component>
-  <component name="TestRunnerService">
-    <option name="projectConfiguration" value="Unittests" />
-    <option name="PROJECT_TEST_RUNNER" value="Unittests" />
-  </component>
-</module>"""
-        )
+        metadata_file.write.assert_called_with(_EXPECTED_IML_XML)
@@ -30,29 +30,38 @@ from pybuilder.plugins.python.sonarqube_plugin import (
 )
 from pybuilder.reactor import Reactor
 
+_REACTOR_SPEC = dir(Reactor)
+
+_EXPECTED_SONAR_COMMAND = (
+    "sonar-scanner -Dsonar.projectKey=project_key "
+    "-Dsonar.projectName=project_name "
+    "-Dsonar.projectVersion=0.0.1 "
+    "-Dsonar.sources=src/main/python "
+    "-Dsonar.python.coverage.reportPath=%s" % nc("target/reports/coverage*.xml")
+)
+
+_SONAR_PROPERTIES = {
+    "sonarqube_project_key": "project_key",
+    "sonarqube_project_name": "project_name",
+    "dir_source_main_python": "src/main/python",
+    "dir_target": "target",
+    "dir_reports": "target/reports",
+}
+
 
 class RunSonarAnalysisTest(TestCase):
     def setUp(self):
         self.project = Project("any-project")
         self.project.version = "0.0.1"
-        self.project.set_property("sonarqube_project_key", "project_key")
-        self.project.set_property("sonarqube_project_name", "project_name")
-        self.project.set_property("dir_source_main_python", "src/main/python")
-        self.project.set_property("dir_target", "target")
-        self.project.set_property("dir_reports", "target/reports")
-        self.reactor = Mock(Reactor)
+        self.project.properties.update(_SONAR_PROPERTIES)
+        self.reactor = Mock(spec=_REACTOR_SPEC)
         pyb_env = Mock()
         self.reactor.python_env_registry = {"pybuilder": pyb_env}
 
     def test_should_build_sonar_scanner_for_project(self):
         self.assertEqual(
             build_sonar_scanner(self.project, self.reactor).as_string,
-            "sonar-scanner -Dsonar.projectKey=project_key "
-            "-Dsonar.projectName=project_name "
-            "-Dsonar.projectVersion=0.0.1 "
-            "-Dsonar.sources=src/main/python "
-            "-Dsonar.python.coverage.reportPath=%s"
-            % nc("target/reports/coverage*.xml"),
+            _EXPECTED_SONAR_COMMAND,
         )
 
     @patch("pybuilder.plugins.python.sonarqube_plugin.SonarCommandBuilder.run")
@@ -17,9 +17,17 @@
 #   limitations under the License.
 
 import ast
-from unittest import TestCase
+import os
+import shutil
+import tempfile
+from os.path import join as jp
+from unittest import TestCase, skipUnless
 
-from pybuilder.plugins.python.vendorize_plugin import ImportTransformer
+from test_utils import Mock, patch
+
+from pybuilder.errors import BuildFailedException
+from pybuilder.plugins.python import vendorize_plugin
+from pybuilder.plugins.python.vendorize_plugin import ImportTransformer, _apply_patch
 
 __author__ = "Arcadiy Ivanov"
 
@@ -126,3 +134,53 @@ class ImportTransformerTests(TestCase):
         )
         it.visit(parsed_ast)
         return it.transformed_source
+
+
+class ApplyPatchTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    @patch.object(vendorize_plugin, "execute_command", return_value=0)
+    def test_should_patch_relative_to_target_dir(self, execute_command):
+        logger = Mock()
+        _apply_patch("/p/virtualenv.patch", "/t/_vendor", "/l/vendorize.log", logger)
+
+        execute_command.assert_called_once_with(
+            ["patch", "-p1", "-N", "-d", "/t/_vendor", "-i", "/p/virtualenv.patch"],
+            "/l/vendorize.log",
+            logger=logger,
+        )
+
+    @patch.object(vendorize_plugin, "execute_command", return_value=1)
+    def test_should_fail_build_when_patch_does_not_apply(self, _):
+        self.assertRaises(
+            BuildFailedException,
+            _apply_patch,
+            "/p/virtualenv.patch",
+            "/t/_vendor",
+            "/l/vendorize.log",
+            Mock(),
+        )
+
+    @skipUnless(shutil.which("patch"), "patch is not installed")
+    def test_should_apply_patch_to_vendorized_sources(self):
+        target_dir = jp(self.tmp_dir, "_vendor")
+        source_file = jp(target_dir, "pkg", "mod.py")
+        patch_file = jp(self.tmp_dir, "pkg.patch")
+        os.makedirs(jp(target_dir, "pkg"))
+        with open(source_file, "w") as f:
+            f.write("a = 1\n")
+        with open(patch_file, "w") as f:
+            f.write(
+                "--- a/pkg/mod.py\n"
+                "+++ b/pkg/mod.py\n"
+                "@@ -1 +1 @@\n"
+                "-a = 1\n"
+                "+a = 2\n"
+            )
+
+        _apply_patch(patch_file, target_dir, jp(self.tmp_dir, "patch.log"), Mock())
+
+        with open(source_file) as f:
+            self.assertEqual("a = 2\n", f.read())
@@ -0,0 +1,215 @@
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of PyBuilder
+#
+#   Copyright 2011-2020 PyBuilder Team
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for the behaviour src/main/vendor_patches/virtualenv.patch adds to the vendorized virtualenv"""
+
+import gc
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import unittest
+from os.path import exists, join as jp
+
+from test_utils import Mock, patch
+
+from pybuilder import extern  # noqa: F401 resolves the absolute imports inside the vendorized packages
+from pybuilder._vendor.virtualenv.app_data.via_disk_folder import AppDataDiskFolder, JSONStoreDisk
+from pybuilder._vendor.virtualenv.app_data.via_tempdir import TempAppData
+from pybuilder._vendor.virtualenv.create.via_global_ref.builtin.cpython import common, mac_os
+from pybuilder._vendor.virtualenv.util import lock
+
+_WHAT = "@executable_path/../../../../Python3"
+_VALUE = "@executable_path/../.Python"
+
+
+def _pad8(b):
+    return b + b"\0" * (-len(b) % 8)
+
+
+def _thin_mach_o(endian, bits, names):
+    commands = []
+    for name in names:
+        name = _pad8(name.encode() + b"\0")
+        # LC_LOAD_DYLIB with its name right after the 24 byte command header, followed by an unrelated command
+        commands.append(struct.pack(endian + "6L", 0xC, 24 + len(name), 24, 0, 0, 0) + name)
+        commands.append(struct.pack(endian + "2L", 0x19, 72) + b"\0" * 64)
+    body = b"".join(commands)
+    header = struct.pack(endian + "7L", 0xFEEDFACF if bits == 64 else 0xFEEDFACE, 7, 3, 2, len(commands), len(body), 0)
+    if bits == 64:
+        header += struct.pack(endian + "L", 0)
+    return header + body + b"\xAB" * 100
+
+
+def _fat_mach_o(slices):
+    header = struct.pack(">2L", 0xCAFEBABE, len(slices))
+    offset, arches, data = 4096, [], b""
+    for s in slices:
+        arches.append(struct.pack(">5L", 7, 3, offset, len(s), 12))
+        data += b"\0" * (offset - len(header) - 20 * len(slices) - len(data)) + s
+        offset += (len(s) + 4095) // 4096 * 4096
+    return header + b"".join(arches) + data
+
+
+class MachOTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def fix(self, content):
+        exe = jp(self.tmp_dir, "python")
+        with open(exe, "wb") as f:
+            f.write(content)
+        mac_os.fix_mach_o(exe, _WHAT, _VALUE, sys.maxsize)
+        with open(exe, "rb") as f:
+            return f.read()
+
+    def test_should_change_name_in_place_for_every_layout(self):
+        # like install_name_tool, only the new name and its terminator are written over the old one
+        what = _WHAT.encode()
+        value = _VALUE.encode() + b"\0" + what[len(_VALUE) + 1 :]
+        for content in (
+            _thin_mach_o("<", 64, ["/usr/lib/libSystem.B.dylib", _WHAT]),
+            _thin_mach_o(">", 32, [_WHAT, "/usr/lib/libc.dylib"]),
+            _fat_mach_o([_thin_mach_o("<", 64, [_WHAT]), _thin_mach_o(">", 32, ["/b", _WHAT])]),
+        ):
+            with self.subTest(magic=content[:4]):
+                self.assertEqual(content.replace(what, value), self.fix(content))
+
+    def test_should_leave_other_names_alone(self):
+        content = _thin_mach_o("<", 64, ["/usr/lib/libz.dylib"])
+        self.assertEqual(content, self.fix(content))
+
+    @patch.object(mac_os.subprocess, "check_call")
+    def test_should_skip_files_that_are_not_mach_o(self, check_call):
+        content = b"#!/bin/sh\necho hi\n" * 10
+        self.assertEqual(content, self.fix(content))
+        check_call.assert_not_called()
+
+    @patch.object(mac_os.subprocess, "check_call")
+    def test_should_fall_back_to_install_name_tool_for_malformed_files(self, check_call):
+        content = _thin_mach_o("<", 64, [_WHAT])[:40]
+        self.assertEqual(content, self.fix(content))
+        check_call.assert_called_once_with(["install_name_tool", "-change", _WHAT, _VALUE, jp(self.tmp_dir, "python")])
+
+
+class LockTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_reentrant_file_lock_should_hold_the_file_until_the_outermost_exit(self):
+        file_lock = lock.ReentrantFileLock(self.tmp_dir)
+        with file_lock:
+            with file_lock:
+                pass
+            self.assertTrue(file_lock._lock.is_locked)
+        self.assertIsNone(file_lock._lock)
+
+    def test_reentrant_file_lock_should_share_one_lock_per_file(self):
+        with lock.ReentrantFileLock(self.tmp_dir).lock_for_key("key"):
+            with (lock.ReentrantFileLock(self.tmp_dir) / ".").lock_for_key("key"):
+                self.assertEqual(1, len(lock._lock_store))
+        gc.collect()
+        self.assertEqual(0, len(lock._lock_store))
+
+    def test_process_local_lock_should_be_reentrant_and_exclusive_across_threads(self):
+        local_lock = lock.ProcessLocalLock(jp(self.tmp_dir, "folder"))
+        acquired = []
+        with local_lock:
+            with local_lock:
+                pass
+            thread = threading.Thread(target=lambda: acquired.append(local_lock._create_lock().acquire(False)))
+            thread.start()
+            thread.join()
+        self.assertEqual([False], acquired)
+        self.assertTrue(exists(jp(self.tmp_dir, "folder")))
+
+    def test_process_local_lock_should_time_out_without_blocking(self):
+        local_lock = lock.ProcessLocalLock(self.tmp_dir)
+        with local_lock.non_reentrant_lock_for_key("key"):
+            pass
+        with local_lock.lock_for_key("key"):
+            thread_errors = []
+
+            def try_lock():
+                try:
+                    with local_lock.lock_for_key("key", no_block=True):
+                        pass
+                except lock.Timeout as e:
+                    thread_errors.append(e)
+
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+        self.assertEqual(1, len(thread_errors))
+
+    def test_process_local_locks_should_not_outlive_their_users(self):
+        with lock.ProcessLocalLock(self.tmp_dir).lock_for_key("key"):
+            pass
+        gc.collect()
+        self.assertEqual(0, len(lock._local_lock_store))
+
+    def test_temp_app_data_should_lock_locally(self):
+        app_data = TempAppData()
+        self.addCleanup(app_data.close)
+        self.assertIsInstance(app_data.lock, lock.ProcessLocalLock)
+
+
+class JSONStoreDiskTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.store = AppDataDiskFolder(self.tmp_dir).py_info(jp(self.tmp_dir, "python"))
+
+    def test_should_read_back_what_was_written(self):
+        self.assertFalse(self.store.exists())
+        self.store.write({"b": 1, "a": [1, 2]})
+        self.assertEqual({"b": 1, "a": [1, 2]}, self.store.read())
+        self.assertIs(self.store.read(), self.store.read())
+
+    def test_should_not_serve_stale_content(self):
+        self.store.write({"a": 1})
+        self.store.read()
+        self.store.write({"a": 22})
+        self.assertEqual({"a": 22}, self.store.read())
+
+        self.store.file.write_text('{"a": 333}')
+        self.assertEqual({"a": 333}, self.store.read())
+
+        self.store.remove()
+        self.assertNotIn(self.store.file, JSONStoreDisk._MEM_CACHE)
+        self.assertIsNone(self.store.read())
+
+
+class CPythonCommonTests(unittest.TestCase):
+    def test_should_list_each_posix_executable_name_once(self):
+        host_exe, targets = common._posix_exe_targets("/usr/bin/python3.11", 3, 11)
+        self.assertEqual("python3.11", host_exe.name)
+        self.assertEqual(("python", "python3", "python3.11"), targets)
+
+    def test_should_detect_mac_os_framework_only_on_darwin(self):
+        interpreter = Mock(platform="linux")
+        self.assertFalse(common.is_mac_os_framework(interpreter))
+
+        interpreter = Mock(platform="darwin", sysconfig_vars={"PYTHONFRAMEWORK": "Python3"})
+        interpreter.version_info.major = 3
+        self.assertTrue(common.is_mac_os_framework(interpreter))
+        interpreter.sysconfig_vars = {}
+        self.assertTrue(common.is_mac_os_framework(interpreter))